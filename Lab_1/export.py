@@ -0,0 +1,160 @@
+"""High-resolution and vector export of a scene (see scene.py).
+
+PNG output is rendered in square tiles by a pool of worker processes and
+written to disk one band of tiles at a time through a streaming PNG encoder,
+so memory use depends on the tile size and the image width, never on the
+image height; a 20000x24000 poster needs about two bands of tiles in memory
+instead of a 1.9 GB image buffer.  SVG and PDF output go straight through
+Cairo's vector surfaces and stay sharp at any size:
+
+    python export.py house.json poster.png --width 20000 --tile 512 --workers 4
+    python export.py street.json street.svg
+    python export.py house.json house.pdf
+"""
+import argparse
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cairo
+
+from scene import SceneRenderer, load_scene
+
+TILE_SIZE = 512           # Side of one rendered tile in pixels
+IDAT_CHUNK = 1 << 20      # Compressed bytes per PNG data chunk
+COMPRESSION_LEVEL = 6
+
+
+class PNGStreamWriter:
+    """Write an 8-bit RGB PNG row by row without holding the whole image."""
+
+    def __init__(self, path, width, height, level=COMPRESSION_LEVEL):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._file = open(path, 'wb')
+        self._compressor = zlib.compressobj(level)
+        self._pending = bytearray()
+        self._file.write(b'\x89PNG\r\n\x1a\n')
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))  # 8-bit RGB
+
+    def _chunk(self, kind, data):
+        self._file.write(struct.pack('>I', len(data)) + kind + data)
+        self._file.write(struct.pack('>I', zlib.crc32(kind + data)))
+
+    def write_row(self, row):
+        """Append one row of width * 3 RGB bytes."""
+        self._pending += self._compressor.compress(b'\x00' + row)  # Filter type 0 (none)
+        self.rows_written += 1
+        if len(self._pending) >= IDAT_CHUNK:
+            self._chunk(b'IDAT', bytes(self._pending))
+            self._pending.clear()
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"wrote {self.rows_written} of {self.height} rows")
+        self._pending += self._compressor.flush()
+        self._chunk(b'IDAT', bytes(self._pending))
+        self._chunk(b'IEND', b'')
+        self._file.close()
+
+
+# Worker processes: each keeps its own renderer, so components are recorded once per process
+_renderer = None
+_scale = 1.0
+
+
+def _init_worker(scene, scale):
+    global _renderer, _scale
+    _renderer = SceneRenderer(scene)
+    _scale = scale
+
+
+def render_tile(x, y, width, height):
+    """Render one tile of the scaled scene and return its rows as RGB bytes."""
+    surface = cairo.ImageSurface(cairo.FORMAT_RGB24, width, height)
+    context = cairo.Context(surface)
+    context.translate(-x, -y)
+    context.scale(_scale, _scale)
+    _renderer.render(context)
+    surface.flush()
+    data = surface.get_data()
+    stride = surface.get_stride()
+    rgb = bytearray(width * height * 3)
+    for row in range(height):
+        pixels = data[row * stride:row * stride + width * 4]  # B, G, R, unused per pixel (little-endian)
+        start = row * width * 3
+        line = memoryview(rgb)[start:start + width * 3]
+        line[0::3] = pixels[2::4]
+        line[1::3] = pixels[1::4]
+        line[2::3] = pixels[0::4]
+    return bytes(rgb)
+
+
+def export_png(scene, path, width, tile=TILE_SIZE, workers=None):
+    """Render the scene scaled to `width` pixels wide into a PNG, tile by tile."""
+    scale = width / scene['width']
+    height = round(scene['height'] * scale)
+    columns = [(x, min(tile, width - x)) for x in range(0, width, tile)]
+    bands = [(y, min(tile, height - y)) for y in range(0, height, tile)]
+    writer = PNGStreamWriter(path, width, height)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(scene, scale)) as pool:
+        pending = deque()  # Bands submitted but not yet written, at most two
+        bands_left = iter(bands)
+
+        def submit_next_band():
+            band = next(bands_left, None)
+            if band is not None:
+                y, band_height = band
+                pending.append((band_height, [pool.submit(render_tile, x, y, tile_width, band_height)
+                                              for x, tile_width in columns]))
+
+        submit_next_band()
+        submit_next_band()
+        while pending:
+            band_height, futures = pending.popleft()
+            tiles = [future.result() for future in futures]
+            submit_next_band()  # Keep the workers busy while this band is written
+            for row in range(band_height):
+                writer.write_row(b''.join(
+                    tile_rgb[row * tile_width * 3:(row + 1) * tile_width * 3]
+                    for tile_rgb, (_, tile_width) in zip(tiles, columns)))
+    writer.close()
+
+
+def export_vector(scene, path, width=None):
+    """Write the scene as SVG or PDF (chosen by the file extension)."""
+    scale = (width or scene['width']) / scene['width']
+    size = (scene['width'] * scale, scene['height'] * scale)
+    if path.lower().endswith('.svg'):
+        surface = cairo.SVGSurface(path, *size)
+    elif path.lower().endswith('.pdf'):
+        surface = cairo.PDFSurface(path, *size)
+    else:
+        raise ValueError("vector output must be .svg or .pdf")
+    context = cairo.Context(surface)
+    context.scale(scale, scale)
+    SceneRenderer(scene).render(context)
+    surface.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a scene as a tiled PNG, SVG or PDF.")
+    parser.add_argument('scene', help="scene JSON, e.g. house.json")
+    parser.add_argument('output', help="output file (.png, .svg or .pdf)")
+    parser.add_argument('--width', type=int, help="output width in pixels (default: the scene's width)")
+    parser.add_argument('--tile', type=int, default=TILE_SIZE, help="tile size in pixels")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="render processes")
+    args = parser.parse_args()
+
+    scene = load_scene(args.scene)
+    if args.output.lower().endswith(('.svg', '.pdf')):
+        export_vector(scene, args.output, args.width)
+    else:
+        export_png(scene, args.output, args.width or scene['width'], args.tile, args.workers)
+
+
+if __name__ == '__main__':
+    main()
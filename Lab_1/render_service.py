@@ -0,0 +1,302 @@
+"""Local HTTP service that renders the house with custom sizes, colors and line widths.
+
+    python render_service.py [--scene house.json] [--port 8080] [--workers 2]
+    curl -o house.png "http://127.0.0.1:8080/house.png?width=525&color.door=ff0000&line.outline=8"
+
+Query parameters of /house.png (all optional):
+
+    width=N               output width in pixels; the height keeps the scene's aspect ratio
+    color.<component>=    stroke color of a component (door, window, outline, ...) as rrggbb
+    fill.<component>=     plain fill color of a component as rrggbb
+    line.<component>=W    stroke width of a component
+
+Every distinct set of parameters is rendered once.  Encoded PNGs are kept in
+a least-recently-used cache in memory and in a cache folder on disk, both
+bounded in bytes and keyed by a hash of the scene and the parameters, so a
+repeated request is a dictionary lookup and survives restarts.  Misses are
+rendered in a pool of worker processes, so the event loop never waits on
+Cairo, and concurrent requests for the same missing image share one render.
+/stats returns the cache counters as JSON.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from scene import SCENE_DIR, load_scene, render_png_bytes, restyle
+
+SERVICE_PORT = 8080
+MEMORY_CACHE_BYTES = 64 << 20     # Encoded PNGs kept in memory
+DISK_CACHE_BYTES = 512 << 20      # Encoded PNGs kept in the cache folder
+CACHE_DIR = os.path.join(SCENE_DIR, 'render_cache')
+MIN_WIDTH, MAX_WIDTH = 16, 8192
+MAX_LINE_WIDTH = 100
+MAX_REQUEST_LINE = 8192           # Longest request or header line accepted
+
+
+def parse_color(text):
+    """Turn 'rrggbb' (with or without '#') into a Cairo RGB list."""
+    text = text.lstrip('#')
+    if len(text) != 6:
+        raise ValueError(f"color {text!r} is not rrggbb")
+    return [round(int(text[i:i + 2], 16) / 255, 4) for i in (0, 2, 4)]
+
+
+def parse_params(query, scene):
+    """Check a query string and return its parameters in one canonical form."""
+    params = {'width': scene['width'], 'colors': {}, 'fills': {}, 'line_widths': {}}
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        if name == 'width':
+            width = int(value)
+            if not MIN_WIDTH <= width <= MAX_WIDTH:
+                raise ValueError(f"width must be {MIN_WIDTH} to {MAX_WIDTH}")
+            params['width'] = width
+            continue
+        kind, _, component = name.partition('.')
+        if component not in scene['components']:
+            raise ValueError(f"unknown parameter {name!r}")
+        if kind == 'color':
+            params['colors'][component] = parse_color(value)
+        elif kind == 'fill':
+            params['fills'][component] = parse_color(value)
+        elif kind == 'line':
+            line_width = float(value)
+            if not 0 <= line_width <= MAX_LINE_WIDTH:
+                raise ValueError(f"line width must be 0 to {MAX_LINE_WIDTH}")
+            params['line_widths'][component] = line_width
+        else:
+            raise ValueError(f"unknown parameter {name!r}")
+    return params
+
+
+def cache_key(scene_digest, params):
+    return hashlib.sha256((scene_digest + json.dumps(params, sort_keys=True)).encode()).hexdigest()[:32]
+
+
+# Worker processes: the scene is sent once, when each worker starts
+_scene = None
+
+
+def _init_worker(scene):
+    global _scene
+    _scene = scene
+
+
+def render_house(params):
+    """Render the scene with the given (canonical) parameters and return PNG bytes."""
+    scene = restyle(_scene, params['colors'], params['fills'], params['line_widths'])
+    return render_png_bytes(scene, params['width'])
+
+
+class PNGCache:
+    """Least-recently-used PNG cache in memory, backed by a bounded cache folder."""
+
+    def __init__(self, directory=CACHE_DIR, memory_bytes=MEMORY_CACHE_BYTES, disk_bytes=DISK_CACHE_BYTES):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()  # key -> PNG bytes
+        self._memory_size = 0
+        self._disk = OrderedDict()    # key -> file size, least recently used first
+        self._disk_size = 0
+        self._disk_lock = threading.Lock()  # load() and save() run on worker threads
+        os.makedirs(directory, exist_ok=True)
+        files = [entry for entry in os.scandir(directory) if entry.name.endswith('.png')]
+        for entry in sorted(files, key=lambda entry: entry.stat().st_mtime):
+            self._disk[entry.name[:-4]] = entry.stat().st_size
+            self._disk_size += entry.stat().st_size
+        self._trim_disk()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.png')
+
+    def get(self, key):
+        """Return the PNG from memory, or None."""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)  # Mark entry as most recently used
+        return data
+
+    def put(self, key, data):
+        """Keep a PNG in memory, evicting the least recently used ones past the budget."""
+        if key in self._memory or len(data) > self.memory_bytes:
+            return
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    # The disk methods do file I/O; the service runs them on a thread
+
+    def load(self, key):
+        """Return the PNG from the cache folder, or None."""
+        with self._disk_lock:
+            if key not in self._disk:
+                return None
+            try:
+                with open(self._path(key), 'rb') as f:
+                    data = f.read()
+                os.utime(self._path(key))  # Keep the order across restarts
+            except OSError:
+                self._forget(key)
+                return None
+            self._disk.move_to_end(key)
+            return data
+
+    def save(self, key, data):
+        temp_path = self._path(key) + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        with self._disk_lock:
+            os.replace(temp_path, self._path(key))  # Never leave a half-written PNG behind
+            self._forget(key)
+            self._disk[key] = len(data)
+            self._disk_size += len(data)
+            self._trim_disk()
+
+    def _forget(self, key):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_size -= size
+
+    def _trim_disk(self):
+        while self._disk_size > self.disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass  # Already gone
+
+
+class RenderService:
+    """Serves rendered PNGs over HTTP from the cache, rendering misses in worker processes."""
+
+    def __init__(self, scene, cache, pool, render=render_house):
+        self.scene = scene
+        self.cache = cache
+        self.pool = pool
+        self.render = render
+        self.scene_digest = hashlib.sha256(json.dumps(scene, sort_keys=True).encode()).hexdigest()
+        self.counts = {'memory': 0, 'disk': 0, 'render': 0, 'coalesced': 0}
+        self._pending = {}  # key -> Future of a render in progress
+
+    async def png(self, params):
+        """Return (PNG bytes, where they came from) for canonical parameters."""
+        key = cache_key(self.scene_digest, params)
+        data = self.cache.get(key)
+        if data is not None:
+            source = 'memory'
+        elif key in self._pending:
+            data = await asyncio.shield(self._pending[key])  # Someone is already making it
+            source = 'coalesced'
+        else:
+            data, source = await self._fill(key, params)
+        self.counts[source] += 1
+        return data, source
+
+    async def _fill(self, key, params):
+        loop = asyncio.get_running_loop()
+        future = self._pending[key] = loop.create_future()
+        try:
+            data = await loop.run_in_executor(None, self.cache.load, key)
+            source = 'disk'
+            if data is None:
+                data = await loop.run_in_executor(self.pool, self.render, params)
+                source = 'render'
+                await loop.run_in_executor(None, self.cache.save, key, data)
+            self.cache.put(key, data)
+        except Exception as error:
+            future.set_exception(error)
+            future.exception()  # Retrieved here; waiters get it re-raised
+            raise
+        else:
+            future.set_result(data)
+        finally:
+            del self._pending[key]
+        return data, source
+
+    async def respond(self, method, target):
+        """Return (status, content type, body, extra headers) for one request."""
+        if method not in ('GET', 'HEAD'):
+            return '405 Method Not Allowed', 'text/plain', b'GET only\n', {}
+        url = urlsplit(target)
+        if url.path == '/stats':
+            return '200 OK', 'application/json', json.dumps(self.counts).encode(), {}
+        if url.path != '/house.png':
+            return '404 Not Found', 'text/plain', b'try /house.png\n', {}
+        try:
+            params = parse_params(url.query, self.scene)
+        except ValueError as error:
+            return '400 Bad Request', 'text/plain', f"{error}\n".encode(), {}
+        data, source = await self.png(params)
+        return '200 OK', 'image/png', data, {'X-Cache': source, 'Cache-Control': 'max-age=86400'}
+
+    async def handle(self, reader, writer):
+        """Answer HTTP/1.1 requests on one connection until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                keep_alive = version == 'HTTP/1.1'
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'connection':
+                        keep_alive = value.strip().lower() == 'keep-alive'
+                start = time.perf_counter()
+                status, content_type, body, headers = await self.respond(method, target)
+                headers['Server-Timing'] = f"total;dur={(time.perf_counter() - start) * 1000:.3f}"
+                head = [f"HTTP/1.1 {status}", f"Content-Type: {content_type}", f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{name}: {value}" for name, value in headers.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, ConnectionError, asyncio.LimitOverrunError, asyncio.CancelledError):
+            pass  # Malformed request, the client went away or the server is shutting down
+        except Exception as error:
+            print(f"Render failed: {error!r}")
+            writer.write(b"HTTP/1.1 500 Internal Server Error\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        finally:
+            writer.close()
+
+
+async def serve(scene, host, port, workers):
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(scene,)) as pool:
+        service = RenderService(scene, PNGCache(), pool)
+        server = await asyncio.start_server(service.handle, host, port, limit=MAX_REQUEST_LINE)
+        print(f"Serving http://{host}:{port}/house.png")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve renders of a scene with custom sizes, colors and line widths.")
+    parser.add_argument('--scene', default='house.json', help="scene JSON to serve")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--workers', type=int, default=2, help="render processes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(load_scene(args.scene), args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
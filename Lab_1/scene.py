@@ -0,0 +1,215 @@
+"""Data-driven Cairo renderer for the Lab 1 house drawing.
+
+A scene file (JSON) describes reusable components and where to place them:
+
+    {
+      "width": 1050, "height": 1200, "background": [1, 1, 1],
+      "components": {
+        "window": [
+          {"shape": "polygon", "points": [[0, 0], [150, 0], [150, 150], [0, 150]], "closed": true,
+           "stroke": [0.4, 0.8, 0], "line_width": 5},
+          {"shape": "lines", "segments": [[75, 0, 75, 150], [0, 75, 150, 75]],
+           "stroke": [0, 0, 1], "line_width": 3}
+        ],
+        "house": [
+          {"component": "window", "translate": [250, 700]},
+          {"component": "window", "translate": [650, 700]}
+        ]
+      },
+      "instances": [{"component": "house"}]
+    }
+
+A component is a list of parts, drawn in order.  A part is either a shape
+(polygon, lines, circle or arc, with "fill" and/or "stroke") or an instance
+of another component, placed with "translate", "rotate" (degrees) and
+"scale".  Angles of arcs are in degrees too.  A fill is an RGB list or a
+linear gradient {"linear": [x0, y0, x1, y1], "stops": [[offset, r, g, b], ...]}.
+
+Every component is drawn once into a cairo.RecordingSurface and every
+instance replays that recording under its transform, so a street of houses
+with dozens of windows runs the Python drawing code for one window, one
+house and one street.  Shape paths are built once and kept with copy_path().
+"""
+import argparse
+import copy
+import io
+import json
+import math
+import os
+
+import cairo
+
+SCENE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_scene(path):
+    """Read a scene file; relative paths are also looked up next to this script."""
+    if not os.path.exists(path):
+        path = os.path.join(SCENE_DIR, path)
+    with open(path) as f:
+        return json.load(f)
+
+
+def build_path(context, part):
+    """Add the outline of one shape part to the context's current path."""
+    shape = part['shape']
+    if shape == 'polygon':
+        points = part['points']
+        context.move_to(*points[0])
+        for point in points[1:]:
+            context.line_to(*point)
+        if part.get('closed'):
+            context.close_path()
+    elif shape == 'lines':
+        for x1, y1, x2, y2 in part['segments']:
+            context.move_to(x1, y1)
+            context.line_to(x2, y2)
+    elif shape == 'circle':
+        context.arc(*part['center'], part['radius'], 0, 2 * math.pi)
+    elif shape == 'arc':
+        context.arc(*part['center'], part['radius'], math.radians(part['start']), math.radians(part['end']))
+    else:
+        raise ValueError(f"unknown shape {shape!r}")
+
+
+def make_source(paint):
+    """Turn an RGB list or a gradient description into a Cairo source."""
+    if isinstance(paint, dict):
+        gradient = cairo.LinearGradient(*paint['linear'])
+        for offset, r, g, b in paint['stops']:
+            gradient.add_color_stop_rgb(offset, r, g, b)
+        return gradient
+    return cairo.SolidPattern(*paint)
+
+
+def apply_transform(context, part):
+    if 'translate' in part:
+        context.translate(*part['translate'])
+    if 'rotate' in part:
+        context.rotate(math.radians(part['rotate']))
+    if 'scale' in part:
+        scale = part['scale']
+        if isinstance(scale, list):
+            context.scale(*scale)
+        else:
+            context.scale(scale, scale)
+
+
+class SceneRenderer:
+    """Draws a scene, recording each component once and replaying it per instance."""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.components = scene['components']
+        self._recordings = {}  # Component name -> RecordingSurface
+        self._paths = {}       # Shape geometry -> cairo.Path
+        self._scratch = cairo.Context(cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None))
+
+    def path(self, part):
+        """Return the Cairo path of a shape part, building it the first time."""
+        key = json.dumps({name: value for name, value in part.items()
+                          if name not in ('fill', 'stroke', 'line_width')}, sort_keys=True)
+        path = self._paths.get(key)
+        if path is None:
+            self._scratch.new_path()
+            build_path(self._scratch, part)
+            path = self._paths[key] = self._scratch.copy_path()
+        return path
+
+    def recording(self, name):
+        """Return the component drawn into a recording surface, drawing it the first time."""
+        recording = self._recordings.get(name)
+        if recording is None:
+            if name not in self.components:
+                raise KeyError(f"scene has no component {name!r}")
+            recording = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
+            context = cairo.Context(recording)
+            for part in self.components[name]:
+                self.draw_part(context, part)
+            self._recordings[name] = recording
+        return recording
+
+    def draw_part(self, context, part):
+        if 'component' in part:
+            self.place(context, part)
+            return
+        context.new_path()
+        context.append_path(self.path(part))
+        if 'fill' in part:
+            context.set_source(make_source(part['fill']))
+            context.fill_preserve()
+        if 'stroke' in part:
+            context.set_source(make_source(part['stroke']))
+            context.set_line_width(part.get('line_width', 1))
+            context.stroke()
+        context.new_path()
+
+    def place(self, context, instance):
+        """Replay a component's recording under the instance's transform."""
+        recording = self.recording(instance['component'])
+        context.save()
+        apply_transform(context, instance)
+        context.set_source_surface(recording, 0, 0)
+        context.paint()
+        context.restore()
+
+    def render(self, context):
+        """Paint the background and every top-level instance of the scene."""
+        context.set_source_rgb(*self.scene.get('background', (1, 1, 1)))
+        context.paint()
+        for instance in self.scene['instances']:
+            self.place(context, instance)
+
+
+def restyle(scene, colors=None, fills=None, line_widths=None):
+    """Return a copy of the scene with new colors and line widths, by component name.
+
+    colors replaces the stroke color and fills the plain (non-gradient) fill
+    color of every shape in a component; line_widths replaces the width of
+    its strokes.
+    """
+    scene = copy.deepcopy(scene)
+    components = scene['components']
+    for name, color in (colors or {}).items():
+        for part in components[name]:
+            if 'stroke' in part:
+                part['stroke'] = color
+    for name, color in (fills or {}).items():
+        for part in components[name]:
+            if isinstance(part.get('fill'), list):  # Gradients keep their own stops
+                part['fill'] = color
+    for name, line_width in (line_widths or {}).items():
+        for part in components[name]:
+            if 'stroke' in part:
+                part['line_width'] = line_width
+    return scene
+
+
+def render_png(scene, path):
+    surface = cairo.ImageSurface(cairo.FORMAT_RGB24, scene['width'], scene['height'])
+    SceneRenderer(scene).render(cairo.Context(surface))
+    surface.write_to_png(path)
+
+
+def render_png_bytes(scene, width=None):
+    """Render the scene scaled to `width` pixels wide and return the encoded PNG."""
+    scale = (width or scene['width']) / scene['width']
+    surface = cairo.ImageSurface(cairo.FORMAT_RGB24, round(scene['width'] * scale), round(scene['height'] * scale))
+    context = cairo.Context(surface)
+    context.scale(scale, scale)
+    SceneRenderer(scene).render(context)
+    output = io.BytesIO()
+    surface.write_to_png(output)
+    return output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a scene file to PNG.")
+    parser.add_argument('scene', help="scene JSON, e.g. house.json or street.json")
+    parser.add_argument('output', help="PNG file to write")
+    args = parser.parse_args()
+    render_png(load_scene(args.scene), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,69 +1,109 @@
+import time    # Import time for the fixed-timestep clock and startup timing
+STARTUP_TIME = time.perf_counter()  # Process start, for the time-to-first-frame budget
+
 import pygame  # Import Pygame library for game development
 import sys     # Import sys for system functions, such as exiting the game
-import random  # Import random for generating random values
+import random  # Import random for picking game seeds
 import os
-
-# Initialize Pygame library
-pygame.init()
-pygame.mixer.init()  # Initialize Pygame mixer for music and sounds
-
-# Constants for game window dimensions and colors
-WIDTH, HEIGHT = 600, 400          # Screen width and height
-RADIUS = 20                        # Ball radius
-PADDLE_WIDTH, PADDLE_HEIGHT = 100, 10  # Paddle dimensions
+import json
+import argparse
+import atexit
+import math
+
+from engine import (  # Headless game state and physics
+    WIDTH, HEIGHT, RADIUS, PADDLE_HEIGHT, BASE_TICK_RATE, MULTI_BALL_RADIUS, skill_levels, game_modes,
+    GameConfig, GameState, update_colors,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_LAUNCH, INPUT_TOGGLE_MUSIC, INPUT_TOGGLE_SOUND,
+    EVENT_WALL, EVENT_TOP, EVENT_PADDLE, EVENT_GAME_OVER, EVENT_BRICK,
+)
+from gradient import GradientCache  # Cached gradient surfaces for the background
+import multiball                     # Array-backed physics for multi-ball mode
+import bricks                        # Brick-breaker levels and their collision grid
+from brick_layer import BrickLayer   # Bricks baked into one surface for drawing
+from dirty import DirtyRenderer      # Partial screen updates for the game loop
+from presenter import ScaledDisplay  # Fixed-resolution drawing scaled to the window
+from capture import FrameCapture     # Video capture on a background encoder thread
+from spectator import SpectatorServer, SPECTATOR_PORT, SPECTATOR_RATE  # Live game state for viewers
+from leaderboard import Leaderboard  # In-memory high scores saved in the background
+from text_cache import TextCache     # Rendered text surfaces reused between frames
+from sprites import SpriteCache      # Pre-rendered ball and shadow sprites
+from assets import AssetManager      # Sounds and music loaded in the background
+from audio import Voice              # How many copies of a sound may play, and how often
+from replay import Replay, step_game, state_digest  # Input recordings that replay a game exactly
+from rewind import RewindBuffer      # The last few seconds of ticks, for rewinding
+from profiler import (  # Per-frame phase timings, HUD and trace export
+    FrameProfiler, PHASE_EVENTS, PHASE_PHYSICS, PHASE_SOUND, PHASE_LEADERBOARD,
+    PHASE_BACKGROUND, PHASE_SPRITES, PHASE_MENU, PHASE_PRESENT, PHASE_PARTICLES,
+)
+from particles import (  # Array-backed particle bursts
+    ParticlePool, PARTICLE_WALL, PARTICLE_PADDLE, PARTICLE_GAME_OVER, PARTICLE_BRICK,
+)
+
+# Initialize only the Pygame modules the game uses (the mixer starts in the background)
+pygame.display.init()
+pygame.font.init()
+
+# Constants for colors
 WHITE = (255, 255, 255)            # RGB color for white
 BLACK = (0, 0, 0)                  # RGB color for black
 
-# Create the game display window
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+# Create the game display window.  The game is laid out at WIDTH x HEIGHT, drawn to
+# `screen` at render_scale times that (the internal render resolution, --render-scale)
+# and scaled to the window (see presenter.py)
+render_scale = 1.0  # Render target pixels per game pixel
+presenter = ScaledDisplay((WIDTH, HEIGHT))
+screen = presenter.open()
 pygame.display.set_caption('Bouncing Ball Game')  # Set window title
+gradient_cache = GradientCache((WIDTH, HEIGHT))  # Ready-made background gradients
+sprite_cache = SpriteCache()                      # Ready-made ball and shadow sprites
+renderer = DirtyRenderer(screen, display=presenter)  # Pushes only changed regions to the window
+
+# Game state: ball, paddle, score and background colors (see engine.py)
+state = GameState(GameConfig.for_skill('Beginner'))
+balls = multiball.BallArray()  # Ball positions and velocities for multi-ball mode
+current_level = bricks.DEFAULT_LEVEL_NAME  # Level played in brick mode (--level)
+brick_field = None             # Bricks of the level, loaded on the first brick game
+brick_layer = BrickLayer((WIDTH, HEIGHT))
+particles = ParticlePool()     # Bursts on bounces and game over
+rewind = RewindBuffer()        # Every tick of the last few seconds; hold Backspace to rewind
+practice = False               # The game was rewound, so its score stays off the leaderboard
+GAME_OVER_REWIND_SECONDS = 3   # How far "Rewind" on the game over menu goes back
+REWIND_FILE = "rewind.csv"     # F6 saves the buffered ticks here for debugging
+
+# Set font for displaying text on the screen (sizes at a render scale of 1)
+FONT_SIZE, SMALL_FONT_SIZE, HUD_FONT_SIZE = 36, 28, 20
+font = pygame.font.Font(None, FONT_SIZE)
+small_font = pygame.font.Font(None, SMALL_FONT_SIZE)
+text_cache = TextCache()  # Rendered labels, keyed by (font, text, color)
+hud_font = pygame.font.Font(None, HUD_FONT_SIZE)  # Profiler HUD text
+
+# Frame profiler: F3 toggles timing and the HUD, F4 exports the recorded frames
+profiler = FrameProfiler()
+PROFILE_FILE = "frame_trace.json"  # Chrome trace, or CSV if the name ends in .csv
 
-# Initial position for paddle and its speed
-paddle_x = (WIDTH - PADDLE_WIDTH) // 2  # Center paddle horizontally
-paddle_y = HEIGHT - PADDLE_HEIGHT - 10  # Position paddle near bottom of screen
-paddle_speed = 8                        # Paddle movement speed
-
-# Initial position and velocity for the ball
-x, y = paddle_x + PADDLE_WIDTH // 2, paddle_y - RADIUS  # Start above paddle center
-dx, dy = 0, 0  # Ball starts stationary
-
-# Score and game state flags
-score = 0            # Player's score
-ball_launched = False  # Tracks if the ball has been launched
-game_over = False      # Tracks if the game is over
-
-# Set font for displaying text on the screen
-font = pygame.font.Font(None, 36)
-small_font = pygame.font.Font(None, 28)
-
-# Random initial background and target colors
-background_color = random.choices(range(256), k=3)  # RGB for gradient background
-target_color = random.choices(range(256), k=3)      # Target color for smooth transition
 ball_color = (0, 0, 255)  # Blue ball
 
-# Leaderboard file
+# Leaderboard file, loaded once and kept in memory
 LEADERBOARD_FILE = "leaderboard.txt"
-
-# Ensure the leaderboard file exists
-if not os.path.exists(LEADERBOARD_FILE):
-    with open(LEADERBOARD_FILE, "w") as f:
-        pass  # Create an empty file
-
-# Music and sound effects
-background_music = "background_music.mp3"  # Replace with your background music file
-collision_sound = pygame.mixer.Sound("collision.wav")  # Replace with collision sound file
-power_up_sound = pygame.mixer.Sound("power_up.mp3")  # Replace with power-up sound file
-game_over_sound = pygame.mixer.Sound("game_over.wav")  # Replace with game over sound file
-
-# Set sound volumes
-collision_sound.set_volume(0.8)
-power_up_sound.set_volume(0.8)
-game_over_sound.set_volume(0.8)
-
-# Start background music
-pygame.mixer.music.load(background_music)
-pygame.mixer.music.set_volume(0.5)  # Adjust volume (0.0 to 1.0)
-pygame.mixer.music.play(-1)  # Loop indefinitely
+leaderboard = Leaderboard(LEADERBOARD_FILE)
+PLAYER_NAME = os.environ.get("BALL_GAME_PLAYER", "Player")  # Name recorded with new high scores
+
+# Music and sound effects, loaded in the background once the start menu is showing
+assets = AssetManager(
+    sounds={
+        # Sound file, volume, and voice limit / priority / minimum seconds between starts
+        'collision': ("collision.wav", 0.8, Voice(max_voices=3, priority=0, min_interval=0.04)),
+        'power_up': ("power_up.mp3", 0.8, Voice(max_voices=2, priority=1, min_interval=0.1)),
+        'game_over': ("game_over.wav", 0.8, Voice(max_voices=1, priority=2, min_interval=0)),
+    },
+    music="background_music.mp3",  # Replace with your background music file
+    music_volume=0.5,
+)
+assets.play_music()  # Starts looping as soon as it has loaded
+
+# Startup time budget: time from launch until the start menu is on screen
+STARTUP_BUDGET_MS = 500
+startup_ms = None  # Measured time to first frame
 
 # Music and sound toggle
 music_enabled = True
@@ -71,21 +111,77 @@ sound_enabled = True
 
 
 # Start Menu
-menu_options = ['New Game', 'High Scores', 'Skill Mode', 'Exit']
-skill_levels = {
-    'Beginner': {'paddle_width': 120, 'ball_speed': 4},
-    'Intermediate': {'paddle_width': 100, 'ball_speed': 6},
-    'Expert': {'paddle_width': 80, 'ball_speed': 8},
-}
+menu_options = ['New Game', 'Game Mode', 'High Scores', 'Skill Mode', 'Exit']
+game_modes = list(game_modes)
 # Default skill level
 current_skill = 'Beginner'
+current_mode = 'Classic'  # Default game mode
 
 MENU_HIGHLIGHT = (100, 100, 255)
 MENU_GRAY = (200, 200, 200)
 
-current_skill_level = "Beginner"
-PADDLE_WIDTH = skill_levels[current_skill_level]["paddle_width"]
-BALL_SPEED = skill_levels[current_skill_level]["ball_speed"]
+# Frame timing: physics runs at a fixed tick rate, rendering as fast as allowed
+TICK_RATE = 60       # Physics ticks per second
+RENDER_FPS = 0       # Render frame cap (0 = uncapped)
+MAX_FRAME_SKIP = 5   # Most physics ticks run for one rendered frame
+DIRTY_RECTS = True   # Update only changed screen regions instead of flipping every frame
+
+# Menus block on input and only redraw when something changes
+MENU_IDLE_TIMEOUT = 1000         # Longest a menu sleeps waiting for input (ms)
+MENU_FPS = 30                    # Frame cap for the animated menu background
+ANIMATE_MENU_BACKGROUND = False  # Let the menu gradient drift while idle
+
+def menu_events(animated=False):
+    """Yield menu input, blocking while nothing happens so idle menus use no CPU.
+
+    Yields KEYDOWN and window-exposed events, plus None whenever an animation
+    frame is due (at most MENU_FPS times per second, and only if animated).
+    Quitting the window exits the game.
+    """
+    frame_ms = 1000 // MENU_FPS
+    next_frame = pygame.time.get_ticks() + frame_ms
+    while True:
+        if animated:
+            timeout = max(1, next_frame - pygame.time.get_ticks())
+        else:
+            timeout = MENU_IDLE_TIMEOUT
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.WINDOWSIZECHANGED:
+            presenter.resize()  # Fit the picture to the new window size
+        if event.type in (pygame.KEYDOWN, pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED):
+            yield event
+        if animated and pygame.time.get_ticks() >= next_frame:
+            next_frame = pygame.time.get_ticks() + frame_ms
+            update_colors(state, 0)  # Drift the menu background toward its target color
+            yield None
+
+
+def present_menu():
+    """Flip a finished menu frame to the display, timing it when profiling."""
+    profiler.mark(PHASE_MENU)
+    presenter.flip()
+    if capture is not None:
+        capture.grab(screen)
+    profiler.mark(PHASE_PRESENT)
+    profiler.end_frame()
+
+
+def first_frame_shown():
+    """Record the time to first frame and start loading sounds and music."""
+    global startup_ms
+
+    startup_ms = (time.perf_counter() - STARTUP_TIME) * 1000
+    if startup_ms > STARTUP_BUDGET_MS:
+        print(f"Startup took {startup_ms:.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    log_path = os.environ.get("BALL_GAME_STARTUP_LOG")  # Append a JSON line per launch for tracking
+    if log_path:
+        with open(log_path, "a") as f:
+            f.write(json.dumps({"time_to_first_frame_ms": round(startup_ms, 1), "budget_ms": STARTUP_BUDGET_MS}) + "\n")
+    assets.start()
+
 
 def display_start_menu():
     # Variables for menu state
@@ -93,229 +189,275 @@ def display_start_menu():
     in_menu = True
     in_skill_selection = False
     selected_skill = 0  # Default skill level index
+    events = menu_events(animated=ANIMATE_MENU_BACKGROUND)
 
     while in_menu:
+        profiler.begin_frame()
         # Clear the screen for the current frame
-        draw_gradient_background(background_color, BLACK)
+        draw_gradient_background(state.background_color, BLACK)
 
         # Display the game title
-        title_text = font.render('Welcome to Ball Paddle Game', True, WHITE)
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 50))
+        title_text = text_cache.render(font, 'Welcome to Ball Paddle Game', WHITE)
+        screen.blit(title_text, centered(title_text, 50))
 
         # Display menu options
         for i, option in enumerate(menu_options):
             color = WHITE if i == selected_option else MENU_GRAY
-            option_text = font.render(option, True, color)
-            screen.blit(option_text, (WIDTH // 2 - option_text.get_width() // 2, 150 + i * 60))
-
-        # Update display
-        pygame.display.flip()
+            option_text = text_cache.render(font, option, color)
+            screen.blit(option_text, centered(option_text, 150 + i * 50))
 
         # Display skill level options if in skill selection
         if in_skill_selection:
             for i, skill in enumerate(skill_levels):
                 color = MENU_HIGHLIGHT if i == selected_skill else MENU_GRAY
-                skill_text = small_font.render(skill, True, color)
-                screen.blit(skill_text, (WIDTH // 2 - skill_text.get_width() // 2, 350 + i * 40))
+                skill_text = text_cache.render(small_font, skill, color)
+                screen.blit(skill_text, centered(skill_text, 350 + i * 40))
 
         # Update the display
-        pygame.display.flip()
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                if in_skill_selection:
-                    # Navigate skill levels
-                    if event.key == pygame.K_UP:
-                        selected_skill = (selected_skill - 1) % len(skill_levels)
-                    elif event.key == pygame.K_DOWN:
-                        selected_skill = (selected_skill + 1) % len(skill_levels)
-                    elif event.key == pygame.K_RETURN:
-                        print(f"Skill Level Selected: {skill_levels[selected_skill]}")
-                        in_skill_selection = False  # Exit skill selection
-                else:
-                    # Navigate main menu
-                    if event.key == pygame.K_UP:
-                        selected_option = (selected_option - 1) % len(menu_options)
-                    elif event.key == pygame.K_DOWN:
-                        selected_option = (selected_option + 1) % len(menu_options)
-                    elif event.key == pygame.K_RETURN:
-                        # Handle menu options
-                        if selected_option == 0:  # New Game
-                            return True  # Exit menu and start the game
-                        elif selected_option == 1:  # High Scores
-                            display_leaderboard_screen()
-                        elif selected_option == 2:  # Skill Level
-                            display_skill_level()
-                        elif selected_option == 3:  # Exit
-                            pygame.quit()
-                            sys.exit()
+        present_menu()
+        if startup_ms is None:
+            first_frame_shown()
+
+        # Wait for a key press (or the next background animation frame)
+        event = next(events)
+        if event is not None and event.type == pygame.KEYDOWN:
+            if in_skill_selection:
+                # Navigate skill levels
+                if event.key == pygame.K_UP:
+                    selected_skill = (selected_skill - 1) % len(skill_levels)
+                elif event.key == pygame.K_DOWN:
+                    selected_skill = (selected_skill + 1) % len(skill_levels)
+                elif event.key == pygame.K_RETURN:
+                    print(f"Skill Level Selected: {skill_levels[selected_skill]}")
+                    in_skill_selection = False  # Exit skill selection
+            else:
+                # Navigate main menu
+                if event.key == pygame.K_UP:
+                    selected_option = (selected_option - 1) % len(menu_options)
+                elif event.key == pygame.K_DOWN:
+                    selected_option = (selected_option + 1) % len(menu_options)
+                elif event.key == pygame.K_RETURN:
+                    # Handle menu options
+                    if selected_option == 0:  # New Game
+                        return True  # Exit menu and start the game
+                    elif selected_option == 1:  # Game Mode
+                        display_game_mode()
+                    elif selected_option == 2:  # High Scores
+                        display_leaderboard_screen()
+                    elif selected_option == 3:  # Skill Level
+                        display_skill_level()
+                    elif selected_option == 4:  # Exit
+                        pygame.quit()
+                        sys.exit()
 
 
 def set_skill_level(level):
-    global PADDLE_WIDTH, BALL_SPEED
+    """Pick the skill level the next game is played at (see GameConfig.for_skill)."""
+    global current_skill
 
-    PADDLE_WIDTH = skill_levels[level]['paddle_width']
-    BALL_SPEED = skill_levels[level]['ball_speed']
+    current_skill = level
 
 
 def display_skill_level():
     selected_skill = 0  # Default skill level index
     in_skill_selection = True
     skill_names = list(skill_levels.keys())
+    events = menu_events()
 
     while in_skill_selection:
+        profiler.begin_frame()
         # Clear the screen
         screen.fill(BLACK)
 
         # Display title
-        title_text = font.render('Select Skill Level', True, WHITE)
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 50))
+        title_text = text_cache.render(font, 'Select Skill Level', WHITE)
+        screen.blit(title_text, centered(title_text, 50))
 
         # Display skill levels
         for i, skill in enumerate(skill_names):
             color = MENU_HIGHLIGHT if i == selected_skill else MENU_GRAY
-            skill_text = font.render(skill, True, color)
-            screen.blit(skill_text, (WIDTH // 2 - skill_text.get_width() // 2, 150 + i * 60))
+            skill_text = text_cache.render(font, skill, color)
+            screen.blit(skill_text, centered(skill_text, 150 + i * 60))
 
         # Update display
-        pygame.display.flip()
+        present_menu()
 
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        # Wait for the next key press
+        event = next(events)
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                selected_skill = (selected_skill - 1) % len(skill_levels)
+            elif event.key == pygame.K_DOWN:
+                selected_skill = (selected_skill + 1) % len(skill_levels)
+            elif event.key == pygame.K_RETURN:
+                # Set selected skill level
+                selected_level = skill_names[selected_skill]
+                set_skill_level(selected_level)
+                return  # Exit skill selection and return to the main menu
 
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected_skill = (selected_skill - 1) % len(skill_levels)
-                elif event.key == pygame.K_DOWN:
-                    selected_skill = (selected_skill + 1) % len(skill_levels)
-                elif event.key == pygame.K_RETURN:
-                    # Set selected skill level
-                    selected_level = skill_names[selected_skill]
-                    set_skill_level(selected_level)
-                    return  # Exit skill selection and return to the main menu
+
+def display_game_mode():
+    global current_mode
+
+    selected_mode = game_modes.index(current_mode)
+    events = menu_events()
+
+    while True:
+        profiler.begin_frame()
+        # Clear the screen
+        screen.fill(BLACK)
+
+        # Display title
+        title_text = text_cache.render(font, 'Select Game Mode', WHITE)
+        screen.blit(title_text, centered(title_text, 50))
+
+        # Display game modes
+        for i, mode in enumerate(game_modes):
+            color = MENU_HIGHLIGHT if i == selected_mode else MENU_GRAY
+            mode_text = text_cache.render(font, mode, color)
+            screen.blit(mode_text, centered(mode_text, 150 + i * 60))
+
+        # Update display
+        present_menu()
+
+        # Wait for the next key press
+        event = next(events)
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                selected_mode = (selected_mode - 1) % len(game_modes)
+            elif event.key == pygame.K_DOWN:
+                selected_mode = (selected_mode + 1) % len(game_modes)
+            elif event.key == pygame.K_RETURN:
+                current_mode = game_modes[selected_mode]
+                return  # Exit mode selection and return to the main menu
 
 
 def display_leaderboard_screen():
     in_leaderboard = True
+    boards = leaderboard_boards()
+    selected_board = boards.index(current_board()) if current_board() in boards else 0
+    events = menu_events()
 
     while in_leaderboard:
+        profiler.begin_frame()
         # Clear the screen
         screen.fill(BLACK)
 
         # Display title
-        title_text = font.render('Leaderboard', True, WHITE)
-        screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2, 50))
+        title_text = text_cache.render(font, f'Leaderboard - {boards[selected_board]}', WHITE)
+        screen.blit(title_text, centered(title_text, 50))
 
-        # Fetch and display leaderboard
-        leaderboard = get_leaderboard()
-        for i, score in enumerate(leaderboard):
-            score_text = small_font.render(f"{i + 1}. {score}", True, WHITE)
-            screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 150 + i * 40))
+        # Display leaderboard
+        for i, (name, score) in enumerate(get_leaderboard(boards[selected_board])):
+            score_text = text_cache.render(small_font, f"{i + 1}. {name}  {score}", WHITE)
+            screen.blit(score_text, centered(score_text, 120 + i * 40))
 
-        # Instruction to return to main menu
-        return_text = small_font.render("Press ENTER to return to the Main Menu", True, MENU_GRAY)
-        screen.blit(return_text, (WIDTH // 2 - return_text.get_width() // 2, HEIGHT - 50))
+        # Instructions to switch boards and return to main menu
+        switch_text = text_cache.render(small_font, "LEFT/RIGHT to change Skill Level", MENU_GRAY)
+        screen.blit(switch_text, centered(switch_text, HEIGHT - 80))
+        return_text = text_cache.render(small_font, "Press ENTER to return to the Main Menu", MENU_GRAY)
+        screen.blit(return_text, centered(return_text, HEIGHT - 50))
 
         # Update display
-        pygame.display.flip()
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+        present_menu()
+
+        # Wait for the next key press
+        event = next(events)
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_LEFT:
+                selected_board = (selected_board - 1) % len(boards)
+            elif event.key == pygame.K_RIGHT:
+                selected_board = (selected_board + 1) % len(boards)
+            elif event.key == pygame.K_RETURN:
                 return  # Exit leaderboard and return to the main menu
 
 
-# Smoothly transition colors for background
-def smooth_color_transition(current, target, speed=1):
-    return tuple(min(255, max(0, current[i] + (speed if current[i] < target[i] else -speed))) for i in range(3))
+# Game coordinates to render target pixels
+def to_render(value):
+    """Convert a game coordinate or length to render target pixels."""
+    return value * render_scale
+
+
+def render_radius(radius):
+    """Ball radius in render target pixels, as a whole number for the sprite cache."""
+    return max(1, round(radius * render_scale))
+
+
+def centered(surface, y):
+    """Render target position that centers a surface horizontally at game height y."""
+    return (screen.get_width() // 2 - surface.get_width() // 2, to_render(y))
+
 
 # Draw gradient background between two colors
 def draw_gradient_background(color1, color2):
-    for i in range(HEIGHT):
-        ratio = i / HEIGHT  # Gradual color blending ratio
-        color = (
-            int(color1[0] * (1 - ratio) + color2[0] * ratio),
-            int(color1[1] * (1 - ratio) + color2[1] * ratio),
-            int(color1[2] * (1 - ratio) + color2[2] * ratio),
-        )
-        pygame.draw.line(screen, color, (0, i), (WIDTH, i))  # Draw a horizontal line for each row
+    screen.blit(gradient_cache.get(color1, color2), (0, 0))  # One blit of a cached gradient
 
 # Realistic shadow for the ball
 def draw_colored_shadow(ball_x, ball_y, ball_radius, paddle_y):
     """Draw a realistic shadow below the ball."""
     shadow_distance = max(0, paddle_y - ball_y)
     shadow_opacity = max(50, min(150, 200 - shadow_distance))
-    shadow_color = (0, 0, 0, shadow_opacity)
-    shadow_surface = pygame.Surface((ball_radius * 4, ball_radius * 2), pygame.SRCALPHA)
-    shadow_width = ball_radius * 2
-    shadow_height = ball_radius // 2
-    pygame.draw.ellipse(
-        shadow_surface,
-        shadow_color,
-        (ball_radius - shadow_width // 2, ball_radius, shadow_width, shadow_height),
-    )
     shadow_x = ball_x - ball_radius * 2
     shadow_y = paddle_y + PADDLE_HEIGHT
-    screen.blit(shadow_surface, (shadow_x, shadow_y))
+    sprite = sprite_cache.shadow(render_radius(ball_radius), shadow_opacity)
+    return screen.blit(sprite, (to_render(shadow_x), to_render(shadow_y)))
 
 
 # Shaded ball for 3D effect
 def draw_shaded_ball(ball_x, ball_y, ball_radius, ball_color):
     """Draw the ball with gradient shading for a 3D effect."""
-    surface = pygame.Surface((ball_radius * 2, ball_radius * 2), pygame.SRCALPHA)
-    for i in range(ball_radius, 0, -1):
-        color_value = int((ball_radius - i) * 255 / ball_radius)
-        gradient_color = (
-            min(255, ball_color[0] + color_value),
-            min(255, ball_color[1] + color_value),
-            min(255, ball_color[2] + color_value),
-            255,
-        )
-        pygame.draw.circle(surface, gradient_color, (ball_radius, ball_radius), i)
-    screen.blit(surface, (ball_x - ball_radius, ball_y - ball_radius))
+    radius = render_radius(ball_radius)
+    return screen.blit(sprite_cache.ball(radius, ball_color), (to_render(ball_x) - radius, to_render(ball_y) - radius))
+
+
+# All balls of multi-ball mode in one batched blit
+def draw_balls(ball_array, ball_radius, ball_color, alpha=1.0):
+    """Draw every live ball of a BallArray with the cached shaded sprite."""
+    radius = render_radius(ball_radius)
+    sprite = sprite_cache.ball(radius, ball_color)
+    corners = (ball_array.interpolate(alpha) * render_scale - radius).astype(int).tolist()
+    return screen.blits([(sprite, corner) for corner in corners])
 
 
 # Leaderboard functions
-def get_leaderboard():
-    """Read leaderboard from file and return as a sorted list of scores."""
-    with open(LEADERBOARD_FILE, "r") as f:
-        scores = [int(line.strip()) for line in f if line.strip().isdigit()]
-    return sorted(scores, reverse=True)[:5]  # Top 5 scores
+def current_board():
+    """Name of the leaderboard for the current skill level, game mode and brick level."""
+    if current_mode == 'Classic':
+        return current_skill
+    if current_mode == 'Bricks' and current_level != bricks.DEFAULT_LEVEL_NAME:
+        return f"{current_mode} {current_level} {current_skill}"  # Other levels keep their own scores
+    return f"{current_mode} {current_skill}"
+
+
+def leaderboard_boards():
+    """Boards to show: every skill level, then any other board with scores."""
+    boards = list(skill_levels)
+    boards += [board for board in leaderboard.boards() if board not in boards]
+    return boards
+
+
+def get_leaderboard(board=None):
+    """Return the top scores of a board as a list of (name, score), best first."""
+    return leaderboard.top(board or current_board())
 
 
 def update_leaderboard(new_score):
-    """Update leaderboard with a new score."""
-    scores = get_leaderboard()
-    scores.append(new_score)
-    scores = sorted(scores, reverse=True)[:5]  # Keep top 5 scores
-    with open(LEADERBOARD_FILE, "w") as f:
-        f.writelines(f"{score}\n" for score in scores)
+    """Update leaderboard with a new score (saved to disk in the background)."""
+    leaderboard.submit(current_board(), PLAYER_NAME, new_score)
 
 
 def display_leaderboard():
     """Display leaderboard on the screen."""
-    leaderboard_title = font.render("Leaderboard:", True, WHITE)
-    screen.blit(leaderboard_title, (WIDTH // 2 - leaderboard_title.get_width() // 2, HEIGHT // 2 - 40))
-    leaderboard = get_leaderboard()
-    for i, score in enumerate(leaderboard):
-        score_text = small_font.render(f"{i + 1}. {score}", True, WHITE)
-        screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, HEIGHT // 2 + i * 30))
+    leaderboard_title = text_cache.render(font, "Leaderboard:", WHITE)
+    screen.blit(leaderboard_title, centered(leaderboard_title, HEIGHT // 2 - 40))
+    for i, (name, score) in enumerate(get_leaderboard()):
+        score_text = text_cache.render(small_font, f"{i + 1}. {name}  {score}", WHITE)
+        screen.blit(score_text, centered(score_text, HEIGHT // 2 + i * 30))
 
 # Display instructions before the game starts
 def display_instructions():
     screen.fill(BLACK)
-    title = font.render("Bouncing Ball Game", True, WHITE)
+    title = text_cache.render(font, "Bouncing Ball Game", WHITE)
     instructions = [
         "Press Left/Right Arrow Keys to Move Paddle",
         "Press Any Key to Launch the Ball",
@@ -324,187 +466,433 @@ def display_instructions():
         "Avoid Missing the Ball!",
         "Press Any Key to Start..."
     ]
-    screen.blit(title, (WIDTH // 2 - title.get_width() // 2, HEIGHT // 4))
+    screen.blit(title, centered(title, HEIGHT // 4))
     for i, text in enumerate(instructions):
-        line = font.render(text, True, WHITE)
-        screen.blit(line, (WIDTH // 2 - line.get_width() // 2, HEIGHT // 2 + i * 30))
-    pygame.display.flip()
+        line = text_cache.render(font, text, WHITE)
+        screen.blit(line, centered(line, HEIGHT // 2 + i * 30))
+    presenter.flip()
     wait_for_key()
 
 
 def display_game_over_menu():
-    selected_option = 0  # 0 for Restart, 1 for Main Menu
-    options = ["Restart", "Main Menu"]
+    selected_option = 0  # 0 for Restart, 1 for Main Menu, 2 for Rewind
+    options = ["Restart", "Main Menu", "Rewind"]
+    events = menu_events(animated=ANIMATE_MENU_BACKGROUND)
 
     while True:
+        profiler.begin_frame()
 
-        draw_gradient_background(background_color, BLACK)  # Clear screen with black background
+        draw_gradient_background(state.background_color, BLACK)  # Clear screen with black background
 
         # Display game over text
-        game_over_text = font.render("Game Over!", True, WHITE)
-        screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, HEIGHT // 4))
+        game_over_text = text_cache.render(font, "Game Over!", WHITE)
+        screen.blit(game_over_text, centered(game_over_text, HEIGHT // 4))
+        if practice:
+            practice_text = text_cache.render(small_font, "Rewound game: score not saved", MENU_GRAY)
+            screen.blit(practice_text, centered(practice_text, HEIGHT // 4 + 40))
 
         # Display menu options
         for i, option in enumerate(options):
             color = WHITE if i == selected_option else MENU_GRAY
-            option_text = font.render(option, True, color)
-            screen.blit(option_text, (WIDTH // 2 - option_text.get_width() // 2, HEIGHT // 2 + i * 50))
+            option_text = text_cache.render(font, option, color)
+            screen.blit(option_text, centered(option_text, HEIGHT // 2 + i * 50))
 
-        pygame.display.flip()  # Refresh the screen
+        present_menu()  # Refresh the screen
 
-        # Handle user input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected_option = (selected_option - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    selected_option = (selected_option + 1) % len(options)
-                elif event.key == pygame.K_RETURN:  # Enter key
-                    return selected_option
+        # Wait for user input (or the next background animation frame)
+        event = next(events)
+        if event is not None and event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                selected_option = (selected_option - 1) % len(options)
+            elif event.key == pygame.K_DOWN:
+                selected_option = (selected_option + 1) % len(options)
+            elif event.key == pygame.K_RETURN:  # Enter key
+                return selected_option
 
 def wait_for_key():
+    for event in menu_events():
+        if event.type == pygame.KEYDOWN:
+            return
+
+# Render the ball and shadow sprites before the first frame
+sprite_cache.warm([RADIUS, MULTI_BALL_RADIUS], [ball_color])
+
+
+
+def new_game(seed=None, tick_rate=TICK_RATE):
+    """Reset the ball, paddle, score and colors for the current skill level and mode.
+
+    Every game gets its own seed, so it can be recorded and replayed.
+    """
+    global recording, brick_field, practice
+
+    if seed is None:
+        seed = random.getrandbits(64)
+    state.reset(GameConfig.for_skill(current_skill, current_mode, tick_rate=tick_rate), seed=seed)
+    balls.clear()
+    particles.clear()
+    if current_mode == 'Bricks':
+        if brick_field is None:
+            brick_field = bricks.BrickField(bricks.load_level(bricks.level_path(current_level)), WIDTH, HEIGHT)
+        brick_field.reset()
+    if record_path:
+        recording = Replay(seed, current_skill, current_mode, tick_rate, level=current_level)
+    rewind.reset(state, mode_state())
+    practice = False
+
+
+def rewind_to(tick):
+    """Put the game back exactly as it was at a recent tick and play on from there.
+
+    The rest of the game is practice: its score is not submitted, so one
+    game can't post several scores or rewind its way to a high score.
+    """
+    global practice
+
+    practice = True
+    rewind.seek(state, mode_state(), tick)
+    if recording is not None:
+        del recording.inputs[state.ticks:]  # The replay carries on from the rewound tick
+    particles.clear()
+    if music_enabled:
+        assets.unpause_music()  # Starts it again if the game had ended
+
+
+def active_balls():
+    """The ball array when playing multi-ball mode, otherwise None."""
+    return balls if current_mode == 'Multi-Ball' else None
+
+
+UPWARD = (0.15 * math.pi, 0.85 * math.pi)  # Angle range of bursts off the paddle and floor
+
+
+def emit_particles(events):
+    """Start particle bursts where this frame's bounces happened."""
+    paddle_y = state.config.paddle_y
+    if active_balls() is None:  # Multi-ball bounces are far too many to burst each one
+        if events & EVENT_WALL:
+            particles.emit(0 if state.x < WIDTH // 2 else WIDTH, state.y, 30, PARTICLE_WALL)
+        if events & EVENT_TOP:
+            particles.emit(state.x, 0, 30, PARTICLE_WALL)
+        if events & EVENT_BRICK:
+            particles.emit(state.x, state.y, 30, PARTICLE_BRICK)
+        ball_x = state.x
+    else:
+        ball_x = state.paddle_x + state.config.paddle_width / 2
+    if events & EVENT_PADDLE:
+        particles.emit(ball_x, paddle_y, 60, PARTICLE_PADDLE, angle=UPWARD)
+    if events & EVENT_GAME_OVER:
+        particles.emit(ball_x, HEIGHT, 600, PARTICLE_GAME_OVER, speed=9, angle=UPWARD)
+
+
+def mode_state():
+    """What the current mode adds to the game: the ball array, the bricks, or None."""
+    if current_mode == 'Bricks':
+        return brick_field
+    return active_balls()
+
+
+# Replays (see replay.py)
+record_path = None  # Where to save each finished game (--record)
+recording = None    # Replay of the game in progress, when recording
+capture = None      # Video capture of every presented frame (--capture)
+spectators = None   # Broadcasts the game to spectator.py viewers (--spectate)
+
+
+def set_window(size=None, fullscreen=False, smooth=True, scale=1.0):
+    """Open the window at another size and draw at `scale` times WIDTH x HEIGHT.
+
+    The layout and physics stay at WIDTH x HEIGHT; a scale below 1 draws
+    fewer pixels (for slow machines), above 1 gives sharper big windows.
+    """
+    global screen, render_scale, gradient_cache, brick_layer, font, small_font, hud_font
+
+    render_scale = scale
+    render_size = (round(WIDTH * scale), round(HEIGHT * scale))
+    if size is None and not fullscreen and render_size != (WIDTH, HEIGHT):
+        size = (WIDTH, HEIGHT)  # The usual window, scaled from the render target
+    screen = presenter.open(size, fullscreen, smooth, render_size)
+    gradient_cache = GradientCache(render_size)
+    brick_layer = BrickLayer(render_size, scale)
+    font = pygame.font.Font(None, round(FONT_SIZE * scale))
+    small_font = pygame.font.Font(None, round(SMALL_FONT_SIZE * scale))
+    hud_font = pygame.font.Font(None, round(HUD_FONT_SIZE * scale))
+    text_cache.clear()
+    sprite_cache.warm([render_radius(RADIUS), render_radius(MULTI_BALL_RADIUS)], [ball_color])
+    renderer.screen = screen
+    renderer.invalidate()
+
+
+def render_scale_arg(text):
+    """Parse a --render-scale argument."""
+    scale = float(text)
+    if not 0.1 <= scale <= 4:
+        raise argparse.ArgumentTypeError(f"render scale must be 0.1 to 4, got {text}")
+    return scale
+
+
+def window_size(text):
+    """Parse a WxH window size argument."""
+    try:
+        width, height = (int(value) for value in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    return width, height
+
+
+def level_name(text):
+    """Check a --level argument names an existing level file."""
+    if not os.path.exists(bricks.level_path(text)):
+        raise argparse.ArgumentTypeError(f"no level {text!r} (looked for {bricks.level_path(text)})")
+    return text
+
+
+def main():
+    global music_enabled, sound_enabled, record_path, current_mode, current_level, capture, spectators
+
+    parser = argparse.ArgumentParser(description="Bouncing Ball Game")
+    parser.add_argument("--record", metavar="FILE", help="save a replay of each finished game to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="watch a recorded game instead of playing")
+    parser.add_argument("--level", metavar="NAME", type=level_name, default=bricks.DEFAULT_LEVEL_NAME,
+                        help="brick mode level: a file in levels/ (e.g. level2) or a path (default %(default)s)")
+    parser.add_argument("--profile", action="store_true", help="start with the frame profiler HUD on")
+    parser.add_argument("--profile-out", metavar="FILE", default=PROFILE_FILE,
+                        help="where F4 exports the profile (.json Chrome trace or .csv)")
+    parser.add_argument("--window", metavar="WxH", type=window_size,
+                        help="window size; the game is still drawn at %dx%d (see --render-scale) and scaled"
+                        % (WIDTH, HEIGHT))
+    parser.add_argument("--fullscreen", action="store_true", help="scale the game to the whole screen")
+    parser.add_argument("--render-scale", metavar="FACTOR", type=render_scale_arg, default=1.0,
+                        help="draw at FACTOR times %dx%d (e.g. 0.5 on slow machines) and scale to the window"
+                        % (WIDTH, HEIGHT))
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record gameplay video: a .mp4/.mkv/.webm file (needs ffmpeg) or a directory for PNG frames")
+    parser.add_argument("--spectate", metavar="PORT", type=int, nargs="?", const=SPECTATOR_PORT,
+                        help="let spectator.py viewers on this machine watch (default port %d)" % SPECTATOR_PORT)
+    parser.add_argument("--spectate-rate", metavar="HZ", type=int, default=SPECTATOR_RATE,
+                        help="updates per second sent to viewers")
+    parser.add_argument("--pixelated", action="store_true", help="scale without smoothing (with --window/--fullscreen)")
+    args = parser.parse_args()
+    profiler.enabled = args.profile
+    current_level = args.level
+    if args.window or args.fullscreen or args.render_scale != 1:
+        set_window(args.window, args.fullscreen, smooth=not args.pixelated, scale=args.render_scale)
+    if args.capture:
+        try:
+            capture = FrameCapture(args.capture, screen.get_size(), screen.get_shifts())
+        except RuntimeError as error:
+            print(f"Not capturing: {error}")
+        else:
+            atexit.register(capture.close)  # Finish the video however the game exits
+    if args.spectate is not None:
+        try:
+            spectators = SpectatorServer(port=args.spectate, rate=args.spectate_rate).start()
+        except OSError as error:
+            print(f"Not serving spectators: {error}")
+            spectators = None
+        else:
+            atexit.register(spectators.stop)
+    record_path = args.record
+    playback = Replay.load(args.replay) if args.replay else None  # Replay being watched
+
+    # Main game loop
+    clock = pygame.time.Clock()
+    renderer.enabled = DIRTY_RECTS
+
+    if playback is not None:
+        # Watch the recorded game with the skill level and mode it was played at
+        set_skill_level(playback.skill)
+        current_mode = playback.mode
+        current_level = playback.level
+        first_frame_shown()
+        new_game(playback.seed, playback.tick_rate)
+    else:
+        if not display_start_menu():
+            sys.exit()
+        assets.start()  # No-op if the start menu already started loading
+        new_game()
+        display_instructions()
+    tick_time = 1.0 / state.config.tick_rate  # Seconds of game time per physics tick
+    accumulator = 0.0       # Real time not yet simulated
+    pending_inputs = 0      # One-shot inputs waiting for the next tick
+    rewound = False         # Showing a past tick after holding Backspace
+    previous_time = time.perf_counter()
     while True:
+        profiler.begin_frame()
+
+        # Handle events, such as quitting the game or pressing keys
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                return
-
-# Initialise skill level
-set_skill_level(current_skill)
-
-# Main game loop
-clock = pygame.time.Clock()
-
-if not display_start_menu():
-    sys.exit()
-display_instructions()
-while True:
-    # Handle events, such as quitting the game or pressing keys
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()  # Close the game window
-            sys.exit()     # Exit the program
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_m:  # Toggle music
-                music_enabled = not music_enabled
-                if music_enabled:
-                    pygame.mixer.music.unpause()  # Resume music
-                else:
-                    pygame.mixer.music.pause()  # Pause music
-            elif event.key == pygame.K_s:  # Toggle sound
-                sound_enabled = not sound_enabled
-            elif event.key == pygame.K_r and game_over:  # Restart game
-                # Reset ball and paddle properties
-                x, y = paddle_x + PADDLE_WIDTH // 2, paddle_y - RADIUS
-                dx = random.choice([-BALL_SPEED, BALL_SPEED])
-                dy = -BALL_SPEED
-                score = 0
-                ball_launched = False
-                game_over = False
-                background_color = random.choices(range(256), k=3)
-                target_color = random.choices(range(256), k=3)
-                if music_enabled:
-                    pygame.mixer.music.play(-1)  # Restart music
-            elif not ball_launched and not game_over:
-                dx = random.choice([-BALL_SPEED, BALL_SPEED])
-                dy = -BALL_SPEED  # Adjust speed dynamically
-                ball_launched = True  # Launch the ball
-
-    # Paddle movement controls
-    keys = pygame.key.get_pressed()  # Check pressed keys
-    if keys[pygame.K_LEFT]:          # Move paddle left if within screen bounds
-        paddle_x = max(0, paddle_x - paddle_speed)
-    if keys[pygame.K_RIGHT]:         # Move paddle right if within screen bounds
-        paddle_x = min(WIDTH - PADDLE_WIDTH, paddle_x + paddle_speed)
-
-    # Only update game state if the game is not over
-    if not game_over:
-        if ball_launched:
-            x += dx  # Update ball's x-coordinate
-            y += dy  # Update ball's y-coordinate
-
-        # Ball collision with left and right walls
-        if x - RADIUS <= 0 or x + RADIUS >= WIDTH:
-            dx = -dx  # Reverse ball's horizontal direction
-            if sound_enabled:
-                collision_sound.play()  # Play collision sound
-            target_color = random.choices(range(256), k=3)  # Change background target color
-
-        # Ball collision with the top wall
-        if y - RADIUS <= 0:
-            dy = -dy  # Reverse ball's vertical direction
-            if sound_enabled:
-                collision_sound.play()  # Play collision sound
-            target_color = random.choices(range(256), k=3)  # Change background target color
-
-        # Ball collision with the paddle
-        if dy > 0 and y + RADIUS >= paddle_y and paddle_x <= x <= paddle_x + PADDLE_WIDTH:
-            dy = -dy  # Reverse ball's vertical direction
-            score += 1  # Increase score
-            if sound_enabled:
-                power_up_sound.play()  # Play power-up sound
-            target_color = random.choices(range(256), k=3)  # Change background target color
-
-        # Game over if ball falls below the paddle
-        if y + RADIUS >= HEIGHT:
-            game_over = True  # Set game state to over
-            dy = 0  # Stop ball movement
-            if sound_enabled:
-                game_over_sound.play()  # Play game over sound
-            pygame.mixer.music.stop()  # Stop background music immediately
-            update_leaderboard(score)
-
-    # Update gradient background color
-    background_color = smooth_color_transition(background_color, target_color, speed=2)
-    if background_color == target_color:
-        target_color = random.choices(range(256), k=3)  # Update target color if transition complete
-    draw_gradient_background(background_color, BLACK)
-
-    # Draw paddle and ball
-    pygame.draw.rect(screen, WHITE, (paddle_x, paddle_y, PADDLE_WIDTH, PADDLE_HEIGHT))  # Paddle
-    if not ball_launched:
-        x = paddle_x + PADDLE_WIDTH // 2  # Position ball above center of paddle
-        y = paddle_y - RADIUS
-    pygame.draw.circle(screen, WHITE, (x, y), RADIUS)  # Ball
-
-    # Display score and instructions
-    if not game_over:
-        draw_colored_shadow(x, y, RADIUS, paddle_y)
-        draw_shaded_ball(x, y, RADIUS, ball_color)
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        screen.blit(score_text, (10, 10))
-    else:
-        option = display_game_over_menu()
-        if option == 0:  # Restart
-            # Reset game variables
-            x, y = paddle_x + PADDLE_WIDTH // 2, paddle_y - RADIUS
-            dx = random.choice([-BALL_SPEED, BALL_SPEED])
-            dy = -BALL_SPEED
-            score = 0
-            ball_launched = False
-            game_over = False
-            background_color = random.choices(range(256), k=3)
-            target_color = random.choices(range(256), k=3)
+                pygame.quit()  # Close the game window
+                sys.exit()     # Exit the program
+            elif event.type == pygame.WINDOWSIZECHANGED:
+                presenter.resize()  # Fit the picture to the new window size
+                renderer.invalidate()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:  # Toggle the profiler HUD
+                profiler.toggle()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:  # Export the profile
+                profiler.export(args.profile_out)
+                print(f"Saved frame profile to {args.profile_out}")
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F6:  # Export the rewind buffer
+                rewind.export_csv(REWIND_FILE)
+                print(f"Saved the last {rewind.newest - rewind.oldest + 1} ticks to {REWIND_FILE}")
+            elif event.type == pygame.KEYDOWN and playback is None:
+                if event.key == pygame.K_m:  # Toggle music
+                    pending_inputs |= INPUT_TOGGLE_MUSIC
+                elif event.key == pygame.K_s:  # Toggle sound
+                    pending_inputs |= INPUT_TOGGLE_SOUND
+                elif event.key == pygame.K_r and state.game_over:  # Restart game
+                    new_game()
+                    if music_enabled:
+                        assets.play_music()  # Restart music
+                elif not state.ball_launched and not state.game_over:
+                    pending_inputs |= INPUT_LAUNCH  # Launch the ball on the next tick
+
+        # Paddle movement controls
+        keys = pygame.key.get_pressed()  # Check pressed keys
+        held_inputs = 0
+        if keys[pygame.K_LEFT]:
+            held_inputs |= INPUT_LEFT
+        if keys[pygame.K_RIGHT]:
+            held_inputs |= INPUT_RIGHT
+        scrubbing = keys[pygame.K_BACKSPACE] and playback is None  # Hold Backspace to run time backwards
+        profiler.mark(PHASE_EVENTS)
+
+        # Run as many fixed physics ticks as the elapsed time calls for
+        now = time.perf_counter()
+        frame_time = now - previous_time
+        accumulator += frame_time
+        previous_time = now
+        events = 0
+        toggles = 0
+        ticks = 0
+        if scrubbing:
+            ticks_back = min(int(accumulator / tick_time), MAX_FRAME_SKIP)  # Backwards at normal speed
+            accumulator = min(accumulator - ticks_back * tick_time, tick_time)
+            rewind.show(state, mode_state(), state.ticks - ticks_back)  # Just shows the buffered tick
+            rewound = True
+        elif rewound:
+            rewind_to(state.ticks)  # Let go of Backspace: play on from the tick on screen
+            rewound = False
+        while accumulator >= tick_time and ticks < MAX_FRAME_SKIP and not state.game_over and not scrubbing:
+            if playback is not None:
+                if state.ticks >= len(playback.inputs):
+                    break  # Recording ended before the game did
+                tick_inputs = playback.inputs[state.ticks]
+            else:
+                tick_inputs = held_inputs | pending_inputs
+                pending_inputs = 0
+                if recording is not None:
+                    recording.record(tick_inputs)
+            events |= step_game(state, mode_state(), tick_inputs)
+            rewind.record(state, mode_state(), tick_inputs)
+            toggles ^= tick_inputs & (INPUT_TOGGLE_MUSIC | INPUT_TOGGLE_SOUND)
+            accumulator -= tick_time
+            ticks += 1
+        if ticks == MAX_FRAME_SKIP:
+            accumulator = min(accumulator, tick_time)  # Drop the backlog instead of spiralling
+        if spectators is not None and (ticks or scrubbing):
+            spectators.publish(state)  # Packs one small record; sending happens on the server thread
+        profiler.mark(PHASE_PHYSICS)
+
+        # Apply music and sound toggles from this frame's ticks
+        if toggles & INPUT_TOGGLE_MUSIC:
+            music_enabled = not music_enabled
             if music_enabled:
-                pygame.mixer.music.play(-1)  # Restart music
-        elif option == 1:  # Main Menu
-            if not display_start_menu():  # Return to main menu
-                sys.exit()
-            # Reset variables for a new game session
-            x, y = paddle_x + PADDLE_WIDTH // 2, paddle_y - RADIUS
-            dx = random.choice([-BALL_SPEED, BALL_SPEED])
-            dy = -BALL_SPEED
-            score = 0
-            ball_launched = False
-            game_over = False
-            background_color = random.choices(range(256), k=3)
-            target_color = random.choices(range(256), k=3)
-
-    # Refresh the display
-    pygame.display.flip()
-    clock.tick(60)  # Limit frame rate to 60 FPS
\ No newline at end of file
+                assets.unpause_music()  # Resume music
+            else:
+                assets.pause_music()  # Pause music
+        if toggles & INPUT_TOGGLE_SOUND:
+            sound_enabled = not sound_enabled
+            assets.enable_sounds(sound_enabled)  # Silences playing effects when turned off
+
+        # React to what happened during those ticks (the mixer skips them while sound is off)
+        if events & (EVENT_WALL | EVENT_TOP | EVENT_BRICK):
+            assets.play('collision')  # Play collision sound
+        if events & EVENT_PADDLE:
+            assets.play('power_up')  # Play power-up sound
+        profiler.mark(PHASE_SOUND)
+        if events & EVENT_GAME_OVER:
+            assets.play('game_over')  # Play game over sound
+            assets.stop_music()  # Stop background music immediately
+            if recording is not None:
+                recording.finish(state, mode_state())
+                recording.save(record_path)
+            if playback is None and not practice:
+                update_leaderboard(state.score)
+            profiler.mark(PHASE_LEADERBOARD)
+        emit_particles(events)
+        particles.update(frame_time * BASE_TICK_RATE)  # Particles age in real time, also after game over
+        profiler.mark(PHASE_PARTICLES)
+
+        if playback is not None and (state.game_over or state.ticks >= len(playback.inputs)):
+            matches = state.score == playback.score and state_digest(state, mode_state()) == playback.digest
+            print(f"Replay finished: score {state.score} after {state.ticks} ticks"
+                  f" ({'matches' if matches else 'DOES NOT match'} the recording)")
+            return
+
+        # Restore the background (fully only when the gradient changed)
+        background = gradient_cache.get(state.background_color, BLACK)
+        if current_mode == 'Bricks':
+            background = brick_layer.background(background, brick_field)  # Bricks baked onto the gradient
+        renderer.begin(background)
+        if current_mode == 'Bricks':
+            for rect in brick_layer.break_bricks(brick_field):
+                renderer.add(screen.blit(background, rect, rect))  # Redraw only where bricks broke
+        profiler.mark(PHASE_BACKGROUND)
+
+        # Draw paddle and ball between the last two physics ticks (no further: once no
+        # ticks run, e.g. after game over, the accumulator keeps growing)
+        alpha = min(accumulator / tick_time, 1.0)
+        ball_x, ball_y, paddle_x = state.interpolate(alpha)
+        paddle_y = state.config.paddle_y
+        radius = state.config.radius
+        paddle = (paddle_x, paddle_y, state.config.paddle_width, PADDLE_HEIGHT)
+        renderer.add(pygame.draw.rect(screen, WHITE, [to_render(value) for value in paddle]))
+        if state.ball_launched and active_balls() is not None:
+            renderer.add_all(draw_balls(balls, radius, ball_color, alpha))
+        else:
+            renderer.add(pygame.draw.circle(screen, WHITE, (to_render(ball_x), to_render(ball_y)), to_render(radius)))  # Ball
+        profiler.mark(PHASE_SPRITES)
+        particle_rect = particles.draw(screen, render_scale)  # All live particles in one batched blit
+        if particle_rect is not None:
+            renderer.add(particle_rect)
+        profiler.mark(PHASE_PARTICLES)
+
+        # Display score and instructions
+        if not state.game_over:
+            if not (state.ball_launched and active_balls() is not None):
+                renderer.add(draw_colored_shadow(ball_x, ball_y, radius, paddle_y))
+                renderer.add(draw_shaded_ball(ball_x, ball_y, radius, ball_color))
+            score_text = text_cache.render(font, f"Score: {state.score}", WHITE)
+            renderer.add(screen.blit(score_text, (to_render(10), to_render(10))))
+            if profiler.enabled:
+                renderer.add(profiler.draw_hud(screen, hud_font, (to_render(10), to_render(10))))
+            profiler.mark(PHASE_SPRITES)
+        elif not particles.active:  # Let the game-over burst play out first
+            option = display_game_over_menu()
+            if option == 0:  # Restart
+                new_game()
+                if music_enabled:
+                    assets.play_music()  # Restart music
+            elif option == 1:  # Main Menu
+                if not display_start_menu():  # Return to main menu
+                    sys.exit()
+                new_game()  # Reset variables for a new game session
+            elif option == 2:  # Rewind a few seconds and try again
+                rewind_to(state.ticks - GAME_OVER_REWIND_SECONDS * state.config.tick_rate)
+            accumulator = 0.0
+            previous_time = time.perf_counter()  # Don't simulate the time spent in menus
+            renderer.invalidate()  # The menu painted over the whole screen
+
+        # Refresh the changed parts of the display
+        renderer.present()
+        if capture is not None:
+            capture.grab(screen)
+        profiler.mark(PHASE_PRESENT)
+        clock.tick(RENDER_FPS)  # Limit frame rate when RENDER_FPS is set
+        profiler.end_frame()
+
+
+if __name__ == "__main__":
+    main()
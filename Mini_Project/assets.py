@@ -0,0 +1,127 @@
+"""Background loading of sounds and music.
+
+The mixer is initialized and every sound decoded on a worker thread, so the
+first window paint doesn't wait for audio.  Until a sound has loaded, or if
+its file is missing or there is no audio device, playing it does nothing.
+Effects are decoded once into an on-disk PCM cache and played through a
+fixed pool of mixer channels (see audio.py).
+"""
+import os
+import threading
+
+import pygame  # Import Pygame library for the mixer
+
+from audio import ChannelPool, PCMCache, Voice, CACHE_DIR_NAME
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))  # Assets live next to the game
+
+
+class AssetManager:
+    """Loads sound effects and background music lazily on a background thread."""
+
+    def __init__(self, sounds, music=None, music_volume=0.5, asset_dir=ASSET_DIR):
+        self.sound_files = sounds     # name -> (file name, volume) or (file name, volume, Voice)
+        self.music_file = music
+        self.music_volume = music_volume
+        self.asset_dir = asset_dir
+        self.sounds = {}              # name -> pygame.mixer.Sound, filled in as sounds load
+        self.voices = {name: spec[2] if len(spec) > 2 else Voice() for name, spec in sounds.items()}
+        self.pcm_cache = PCMCache(os.path.join(asset_dir, CACHE_DIR_NAME))
+        self.channels = None          # ChannelPool, created once the mixer is up
+        self.sound_enabled = True
+        self.music_loaded = False
+        self.music_wanted = False     # Whether music should be playing once it has loaded
+        self.music_started = False
+        self.loaded = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Begin loading all assets in the background."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load_all, name='asset-loader', daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """Block until loading has finished (or failed); returns True if finished."""
+        return self.loaded.wait(timeout)
+
+    def _path(self, file_name):
+        return os.path.join(self.asset_dir, file_name)
+
+    def _load_all(self):
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()  # Initialize Pygame mixer for music and sounds
+            self.channels = ChannelPool()
+            for name, (file_name, volume, *_) in self.sound_files.items():
+                try:
+                    sound = self.pcm_cache.load(self._path(file_name))
+                except (pygame.error, FileNotFoundError) as error:
+                    print(f"Sound '{file_name}' unavailable: {error}")
+                    continue
+                sound.set_volume(volume)
+                self.sounds[name] = sound
+            if self.music_file:
+                try:
+                    pygame.mixer.music.load(self._path(self.music_file))
+                except (pygame.error, FileNotFoundError) as error:
+                    print(f"Music '{self.music_file}' unavailable: {error}")
+                else:
+                    pygame.mixer.music.set_volume(self.music_volume)  # Adjust volume (0.0 to 1.0)
+                    with self._lock:
+                        self.music_loaded = True
+                        if self.music_wanted:
+                            self._start_music()
+        except pygame.error as error:
+            print(f"Audio disabled: {error}")
+        finally:
+            self.loaded.set()
+
+    # Sound effects
+
+    def play(self, name):
+        """Play a sound effect if sounds are on, it has loaded and its voice policy allows it."""
+        sound = self.sounds.get(name)
+        if sound is not None and self.sound_enabled:
+            self.channels.play(name, sound, self.voices[name])
+
+    def enable_sounds(self, enabled):
+        """Turn sound effects on or off, silencing any that are playing."""
+        self.sound_enabled = enabled
+        if not enabled and self.channels is not None:
+            self.channels.stop()
+
+    # Background music
+
+    def _start_music(self):
+        pygame.mixer.music.play(-1)  # Loop indefinitely
+        self.music_started = True
+
+    def play_music(self):
+        """Start the music from the beginning, looping (now, or as soon as it loads)."""
+        with self._lock:
+            self.music_wanted = True
+            if self.music_loaded:
+                self._start_music()
+
+    def stop_music(self):
+        with self._lock:
+            self.music_wanted = False
+            if self.music_loaded:
+                pygame.mixer.music.stop()
+                self.music_started = False
+
+    def pause_music(self):
+        with self._lock:
+            self.music_wanted = False
+            if self.music_started:
+                pygame.mixer.music.pause()
+
+    def unpause_music(self):
+        with self._lock:
+            self.music_wanted = True
+            if self.music_started:
+                pygame.mixer.music.unpause()
+            elif self.music_loaded:
+                self._start_music()
@@ -0,0 +1,137 @@
+"""Pre-decoded sound effects and a managed pool of mixer channels.
+
+PCMCache decodes each effect (WAV, MP3, ...) once into the mixer's own raw
+sample format and keeps the bytes in a cache folder, so later launches build
+the pygame.mixer.Sound straight from PCM without running a decoder.  A cache
+file is tied to the source file's size and modification time and to the
+mixer format, so editing a sound or changing the mixer settings decodes it
+again.
+
+ChannelPool owns a fixed set of mixer channels and decides who gets one.
+Every sound has a Voice policy: how many copies may play at once, a
+priority, and a minimum time between two starts.  A burst of collisions
+therefore costs at most a few channel checks per frame, repeats of the same
+sound restart its oldest copy instead of piling up, and an important sound
+(game over) can take a channel from a less important one, never the other
+way around.
+"""
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+
+import pygame  # Import Pygame library for the mixer
+
+AUDIO_CHANNELS = 8            # Mixer channels shared by all sound effects
+CACHE_DIR_NAME = "audio_cache"
+
+
+@dataclass
+class Voice:
+    """How one sound effect may use the channel pool."""
+    max_voices: int = 2          # Copies of the sound that may play at the same time
+    priority: int = 0            # Higher priorities may take channels from lower ones
+    min_interval: float = 0.05   # Seconds between two starts; closer requests are skipped
+
+
+class PCMCache:
+    """Decoded sound effects stored as raw mixer samples on disk."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_path(self, path):
+        stat = os.stat(path)
+        key = repr((os.path.basename(path), stat.st_size, stat.st_mtime_ns, pygame.mixer.get_init()))
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{digest}.pcm"), stem
+
+    def load(self, path):
+        """Return a pygame.mixer.Sound for the file, decoding it only on a cache miss."""
+        cache_path, stem = self._cache_path(path)
+        try:
+            with open(cache_path, 'rb') as f:
+                sound = pygame.mixer.Sound(buffer=f.read())
+        except OSError:
+            pass
+        else:
+            self.hits += 1
+            return sound
+        self.misses += 1
+        sound = pygame.mixer.Sound(path)  # Decode once with SDL_mixer
+        try:
+            self._store(cache_path, stem, sound.get_raw())
+        except OSError as error:
+            print(f"Could not cache '{path}': {error}")
+        return sound
+
+    def _store(self, cache_path, stem, pcm):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for name in os.listdir(self.cache_dir):  # Remove stale decodes of the same sound
+            if name.startswith(stem + '-') and name.endswith('.pcm'):
+                os.remove(os.path.join(self.cache_dir, name))
+        temp_path = cache_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(pcm)
+        os.replace(temp_path, cache_path)  # Never leave a half-written cache file behind
+
+
+class ChannelPool:
+    """A fixed number of mixer channels handed out by voice limits and priority."""
+
+    def __init__(self, size=AUDIO_CHANNELS):
+        pygame.mixer.set_num_channels(size)
+        pygame.mixer.set_reserved(size)  # Sound.play() elsewhere can't take our channels
+        self.channels = [pygame.mixer.Channel(i) for i in range(size)]
+        self.owners = [None] * size      # Sound name playing on each channel
+        self.priorities = [0] * size
+        self.started = [0.0] * size      # When each channel's sound started
+        self.last_start = {}             # Sound name -> time of its last start
+        self.skipped = 0                 # Requests dropped by rate limits or a full pool
+
+    def play(self, name, sound, voice, now=None):
+        """Start the sound on a channel if its policy allows it; returns the channel index or None."""
+        now = time.perf_counter() if now is None else now
+        if now - self.last_start.get(name, -voice.min_interval) < voice.min_interval:
+            self.skipped += 1
+            return None  # Started too recently; the earlier copy covers this one
+
+        playing = []   # Channels playing this sound
+        free = None
+        victim = None  # Oldest channel playing something of lower priority
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                self.owners[index] = None
+                if free is None:
+                    free = index
+            elif self.owners[index] == name:
+                playing.append(index)
+            elif self.priorities[index] < voice.priority and (
+                    victim is None or self.started[index] < self.started[victim]):
+                victim = index
+
+        if len(playing) >= voice.max_voices:
+            index = min(playing, key=self.started.__getitem__)  # Restart the oldest copy
+        elif free is not None:
+            index = free
+        elif victim is not None:
+            index = victim
+        else:
+            self.skipped += 1
+            return None  # Everything playing matters at least as much
+
+        self.channels[index].play(sound)
+        self.owners[index] = name
+        self.priorities[index] = voice.priority
+        self.started[index] = now
+        self.last_start[name] = now
+        return index
+
+    def stop(self):
+        """Silence every sound effect."""
+        for index, channel in enumerate(self.channels):
+            channel.stop()
+            self.owners[index] = None
@@ -0,0 +1,377 @@
+"""Frame-time benchmarks for the drawing code, run under the SDL dummy driver.
+
+Times each drawing primitive in isolation plus a full scripted game frame,
+writes the per-call times as JSON and compares them against a stored
+baseline:
+
+    python benchmark.py                                  # print results, compare to benchmark_baseline.json
+    python benchmark.py --output results.json            # also save the results
+    python benchmark.py --metric p99_us                  # compare the slowest single calls instead
+    python benchmark.py --threshold 0.1 --threshold-for menu_text=0.3
+    python benchmark.py --save-baseline --processes 20   # accept the current numbers as the new baseline
+
+Exits with status 1 if any benchmark got slower than its threshold allows.
+The baseline file can hold its own allowed slowdown per benchmark (under
+"thresholds"; kept when the baseline is saved again) for the noisier ones;
+--threshold-for overrides those.
+
+Single calls take a few microseconds, too little for the clock to time on
+its own, so (like timeit) each sample times a batch of calls long enough to
+measure and divides by the number of calls.  The median of several batches
+is compared, which leaves out the odd batch slowed down by the rest of the
+machine.  Timings also shift from one interpreter to the next (memory
+layout, CPU placement), so the benchmarks run in several fresh processes,
+one after another, and their medians are combined (the baseline is saved
+from more of them, so it sits in the middle of the spread).  Finally the whole machine gets faster or slower over time
+(frequency scaling, other load), so a fixed reference workload is timed in
+batches taken in turn with each benchmark's own, and comparisons use times
+relative to it, unless --absolute is given.
+
+Batch averages hide the occasional slow call (a gradient cache miss, say),
+so every process also times a run of single calls with perf_counter_ns and
+the results include their p50/p90/p99.  These are noisier than the batched
+median that is compared by default, but any of them can be picked with
+--metric.
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # No window needed
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import platform
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+import Ball_Game as game
+from engine import GameConfig, GameState, step, smooth_color_transition
+from sim import TrackingPolicy
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+DEFAULT_THRESHOLD = 0.15  # Allowed slowdown, unless the baseline or --threshold-for sets one for the benchmark
+DEFAULT_METRIC = 'median_us'
+METRICS = ['min_us', 'median_us', 'mean_us', 'p50_us', 'p90_us', 'p99_us']
+PROCESSES = 5             # Fresh processes the whole suite runs in
+REPEATS = 9               # Timed batches per benchmark and process
+BATCH_TIME = 0.01         # Seconds a batch should take at least; sets the calls per batch
+WARMUP = 200              # Untimed calls first, so caches are in their steady state
+SAMPLES = 1000            # Single calls timed per process for the percentiles
+COLOR_WALK = 4000         # Background colors the color benchmarks cycle through
+
+
+def color_walk(count, seed=1):
+    """Background colors as the game produces them: smooth steps toward random targets."""
+    rng = random.Random(seed)
+    color, target = (0, 0, 0), (255, 255, 255)
+    colors = []
+    for _ in range(count):
+        color = smooth_color_transition(color, target, speed=2)
+        if rng.random() < 0.01:
+            target = tuple(rng.choices(range(256), k=3))
+        colors.append(color)
+    return colors
+
+
+def bench_gradient_background():
+    colors = itertools.cycle(color_walk(COLOR_WALK))
+    return lambda: game.draw_gradient_background(next(colors), game.BLACK)
+
+
+def bench_gradient_build():
+    colors = itertools.cycle(color_walk(COLOR_WALK))
+
+    def run():
+        game.gradient_cache.clear()  # Always a cache miss: measures building one gradient
+        game.draw_gradient_background(next(colors), game.BLACK)
+    return run
+
+
+def bench_shaded_ball():
+    positions = itertools.count()
+    return lambda: game.draw_shaded_ball(100 + next(positions) % 400, 200, game.RADIUS, game.ball_color)
+
+
+def bench_colored_shadow():
+    heights = itertools.count()
+    return lambda: game.draw_colored_shadow(300, next(heights) % 380, game.RADIUS, 370)
+
+
+def bench_score_text():
+    scores = itertools.count()
+
+    def run():
+        score_text = game.text_cache.render(game.font, f"Score: {next(scores) // 100}", game.WHITE)
+        game.screen.blit(score_text, (10, 10))
+    return run
+
+
+def bench_menu_text():
+    def run():
+        for i, option in enumerate(game.menu_options):
+            option_text = game.text_cache.render(game.font, option, game.WHITE if i == 0 else game.MENU_GRAY)
+            game.screen.blit(option_text, (game.WIDTH // 2 - option_text.get_width() // 2, 150 + i * 50))
+    return run
+
+
+def bench_smooth_color_transition():
+    colors = itertools.cycle(color_walk(COLOR_WALK))
+    target = (17, 200, 90)
+    return lambda: smooth_color_transition(next(colors), target, speed=2)
+
+
+FRAME_BACKGROUND = (40, 80, 160)  # Fixed, already cached gradient for the frame benchmarks
+
+
+def bench_full_frame(redraw=False):
+    """One physics tick plus a complete rendered frame, with a scripted player.
+
+    The frame draws over a fixed cached gradient, so building gradients (see
+    gradient_build) never lands in the timings; with redraw the whole
+    background is blitted and flipped every frame, as when its color changes.
+    """
+    state = GameState(GameConfig.for_skill('Intermediate'), seed=7)
+    policy = TrackingPolicy(random.Random(7))
+    renderer = game.renderer
+    background = game.gradient_cache.get(FRAME_BACKGROUND, game.BLACK)
+
+    def run():
+        if state.game_over:
+            state.reset(seed=state.ticks)
+        step(state, policy(state))
+        if redraw:
+            renderer.invalidate()
+        renderer.begin(background)
+        paddle_y = state.config.paddle_y
+        renderer.add(pygame.draw.rect(game.screen, game.WHITE,
+                                      (state.paddle_x, paddle_y, state.config.paddle_width, game.PADDLE_HEIGHT)))
+        renderer.add(game.draw_colored_shadow(state.x, state.y, game.RADIUS, paddle_y))
+        renderer.add(game.draw_shaded_ball(state.x, state.y, game.RADIUS, game.ball_color))
+        score_text = game.text_cache.render(game.font, f"Score: {state.score}", game.WHITE)
+        renderer.add(game.screen.blit(score_text, (10, 10)))
+        renderer.present()
+    return run
+
+
+BENCHMARKS = {
+    'gradient_background': bench_gradient_background,
+    'gradient_build': bench_gradient_build,
+    'shaded_ball': bench_shaded_ball,
+    'colored_shadow': bench_colored_shadow,
+    'score_text': bench_score_text,
+    'menu_text': bench_menu_text,
+    'smooth_color_transition': bench_smooth_color_transition,
+    'full_frame': bench_full_frame,
+    'full_frame_redraw': lambda: bench_full_frame(redraw=True),
+}
+
+
+def time_batch(run, number):
+    """Seconds taken by `number` back-to-back calls of run()."""
+    started = time.perf_counter()
+    for _ in range(number):
+        run()
+    return time.perf_counter() - started
+
+
+def time_calls(run, samples):
+    """Nanoseconds taken by each of `samples` separate calls of run()."""
+    clock = time.perf_counter_ns
+    calls = []
+    for _ in range(samples):
+        started = clock()
+        run()
+        calls.append(clock() - started)
+    return calls
+
+
+def percentile(values, fraction):
+    """Value below which `fraction` of the sorted values lie (nearest rank)."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def batch_size(run, batch_time):
+    """Calls of run() needed for a batch that takes at least batch_time seconds."""
+    number = 1
+    while time_batch(run, number) < batch_time:  # Grow the batch until it can be timed reliably
+        number *= 2
+    return number
+
+
+def measure(run, reference, repeats=REPEATS, batch_time=BATCH_TIME, warmup=WARMUP, samples=SAMPLES):
+    """Time `repeats` batches of calls of run() and summarize the time per call in microseconds.
+
+    A batch of the reference workload is timed before every batch and after
+    the last one, so reference_us shows how fast the machine ran meanwhile.
+    calls_ns holds the times of `samples` single calls for the percentiles;
+    combine() turns them into p50/p90/p99.
+    """
+    for _ in range(warmup):
+        run()
+        reference()
+    calls = time_calls(run, samples)
+    number = batch_size(run, batch_time)
+    reference_number = batch_size(reference, batch_time)
+    timings = []
+    references = [time_batch(reference, reference_number) / reference_number * 1e6]
+    for _ in range(repeats):
+        timings.append(time_batch(run, number) / number * 1e6)
+        references.append(time_batch(reference, reference_number) / reference_number * 1e6)
+    timings.sort()
+    return {
+        'number': number,
+        'repeats': repeats,
+        'reference_us': statistics.median(references),
+        'min_us': timings[0],
+        'median_us': timings[len(timings) // 2],
+        'mean_us': sum(timings) / repeats,
+        'max_us': timings[-1],
+        'calls_ns': calls,
+    }
+
+
+def reference_workload():
+    """Fixed mix of Python and pygame work that never changes, to measure the machine's speed."""
+    surface = pygame.Surface((64, 64))
+
+    def run():
+        total = 0
+        for i in range(100):
+            total += i * i
+        surface.fill((total & 255, 0, 0))
+    return run
+
+
+def measure_all(names):
+    """Process-pool worker: measure the named benchmarks in this process."""
+    reference = reference_workload()
+    return {name: measure(BENCHMARKS[name](), reference) for name in names}
+
+
+def combine(runs):
+    """Merge the summaries of one benchmark from several processes.
+
+    The single calls of all processes are pooled for the percentiles.
+    """
+    calls = sorted(call for run in runs for call in run['calls_ns'])
+    return {
+        'number': runs[0]['number'],
+        'repeats': sum(run['repeats'] for run in runs),
+        'processes': len(runs),
+        'reference_us': statistics.median(run['reference_us'] for run in runs),
+        'min_us': min(run['min_us'] for run in runs),
+        'median_us': statistics.median(run['median_us'] for run in runs),
+        'mean_us': statistics.fmean(run['mean_us'] for run in runs),
+        'max_us': max(run['max_us'] for run in runs),
+        'samples': len(calls),
+        'p50_us': percentile(calls, 0.50) / 1000,
+        'p90_us': percentile(calls, 0.90) / 1000,
+        'p99_us': percentile(calls, 0.99) / 1000,
+    }
+
+
+def run_benchmarks(names, processes=PROCESSES):
+    # One worker at a time so runs don't compete for the CPU, and a new interpreter for every run
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(1, mp_context=context, max_tasks_per_child=1) as pool:
+        runs = list(pool.map(measure_all, [names] * processes))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'video_driver': os.environ.get('SDL_VIDEODRIVER'),
+        },
+        'benchmarks': {name: combine([run[name] for run in runs]) for name in names},
+    }
+
+
+def compare(results, baseline, metric=DEFAULT_METRIC, threshold=DEFAULT_THRESHOLD, overrides=None, absolute=False):
+    """Return a list of (name, baseline, current, change, regressed) rows.
+
+    The change is measured on times relative to the reference workload
+    timed alongside each benchmark, or on the raw times with absolute.  A
+    benchmark's allowed
+    slowdown comes from overrides, then the baseline's thresholds, then
+    threshold.
+    """
+    thresholds = {**baseline.get('thresholds', {}), **(overrides or {})}
+    rows = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            continue
+        speedup = 1.0  # How much faster the machine ran the reference this time
+        if not absolute and 'reference_us' in previous:
+            speedup = previous['reference_us'] / current['reference_us']
+        change = current[metric] * speedup / previous[metric] - 1
+        rows.append((name, previous[metric], current[metric], change, change > thresholds.get(name, threshold)))
+    return rows
+
+
+def parse_override(text):
+    name, _, value = text.partition('=')
+    if name not in BENCHMARKS or not value:
+        raise argparse.ArgumentTypeError(f"expected <benchmark>=<fraction>, got {text!r}")
+    return name, float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's drawing code.")
+    parser.add_argument('--only', action='append', choices=list(BENCHMARKS), help="run only this benchmark")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--processes', type=int, default=PROCESSES, help="fresh processes to run the suite in")
+    parser.add_argument('--metric', default=DEFAULT_METRIC, choices=METRICS,
+                        help="what to compare: batched times (min/median/mean) or single-call percentiles")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (0.15 = 15%%)")
+    parser.add_argument('--absolute', action='store_true',
+                        help="compare raw times instead of times relative to the reference workload")
+    parser.add_argument('--threshold-for', type=parse_override, action='append', default=[],
+                        metavar='NAME=FRACTION', help="allowed slowdown for one benchmark")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only or list(BENCHMARKS), args.processes)
+    print(f"{'benchmark':<26}{'calls':>9}{'min':>9}{'median':>9}{'max':>9}{'p50':>9}{'p90':>9}{'p99':>9}"
+          "  (us per call)")
+    for name, summary in results['benchmarks'].items():
+        print(f"{name:<26}{summary['number']:>9}{summary['min_us']:>9.1f}{summary['median_us']:>9.1f}"
+              f"{summary['max_us']:>9.1f}{summary['p50_us']:>9.1f}{summary['p90_us']:>9.1f}{summary['p99_us']:>9.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                results['thresholds'] = json.load(f).get('thresholds', {})  # Hand-tuned, so keep them
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.metric, args.threshold, dict(args.threshold_for), args.absolute)
+    print(f"\nCompared to {args.baseline} ({args.metric}{', raw times' if args.absolute else ''}):")
+    for name, previous, current, change, regressed in rows:
+        print(f"{name:<26}{previous:>9.1f}{current:>9.1f}{change:>+9.1%}{'  REGRESSION' if regressed else ''}")
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import pygame  # Import Pygame library for surfaces
+
+# Brick colors picked by the digit in the level file
+BRICK_COLORS = [
+    (200, 200, 200), (230, 60, 60), (240, 150, 40), (240, 220, 60),
+    (80, 200, 90), (60, 170, 230), (90, 90, 220), (170, 80, 210),
+    (230, 110, 170), (140, 140, 140),
+]
+KEY_COLOR = (255, 0, 255)  # Transparent color of the brick layer
+
+
+class BrickLayer:
+    """Bricks baked into one static surface and composited over the background.
+
+    The bricks are drawn once per level into a color-keyed layer.  background()
+    returns the gradient with the layer on top, rebuilt only when the gradient
+    surface changes; it alternates between two surfaces so DirtyRenderer sees
+    a new background and redraws the whole screen.  Broken bricks are erased
+    from the layer and the current background in place, and their rects
+    returned so only those regions are redrawn.
+
+    Bricks are given in game coordinates; scale converts them to the pixels
+    of a render target of `size`.
+    """
+
+    def __init__(self, size, scale=1.0):
+        self.size = size
+        self.scale = scale
+        self.layer = pygame.Surface(size)
+        self.layer.set_colorkey(KEY_COLOR)
+        self._backgrounds = [pygame.Surface(size), pygame.Surface(size)]
+        self._current = 0
+        self._gradient = None
+        self._generation = None
+
+    def _rect(self, left, top, right, bottom):
+        """Render target rect of a brick, with edges rounded so neighbouring bricks don't gap or overlap."""
+        scale = self.scale
+        x, y = round(left * scale), round(top * scale)
+        return pygame.Rect(x, y, round(right * scale) - x, round(bottom * scale) - y)
+
+    def bake(self, field):
+        """Draw every standing brick of a BrickField into the layer."""
+        self.layer.fill(KEY_COLOR)
+        for index, (left, top, right, bottom, color) in enumerate(field.bricks):
+            if field.alive[index]:
+                rect = self._rect(left, top, right, bottom)
+                fill = BRICK_COLORS[color % len(BRICK_COLORS)]
+                self.layer.fill(fill, rect)
+                pygame.draw.rect(self.layer, [c // 2 for c in fill], rect, 1)  # Darker outline
+        field.take_destroyed()
+        self._generation = field.generation
+        self._gradient = None  # Composite again on the next background() call
+
+    def background(self, gradient, field):
+        """Return the gradient with the bricks on it, up to date with the field."""
+        if field.generation != self._generation:
+            self.bake(field)  # The level was stood back up (or is new)
+        if gradient is not self._gradient:
+            self._current ^= 1
+            surface = self._backgrounds[self._current]
+            surface.blit(gradient, (0, 0))
+            surface.blit(self.layer, (0, 0))
+            self._gradient = gradient
+        return self._backgrounds[self._current]
+
+    def break_bricks(self, field):
+        """Erase bricks broken since the last call; returns the rects that changed."""
+        surface = self._backgrounds[self._current]
+        rects = []
+        for index in field.take_destroyed():
+            rect = self._rect(*field.bricks[index][:4])
+            self.layer.fill(KEY_COLOR, rect)
+            if self._gradient is not None:
+                surface.blit(self._gradient, rect, rect)
+            rects.append(rect)
+        return rects
@@ -0,0 +1,151 @@
+"""Brick-breaker levels: bricks loaded from a level file and a grid to find them fast.
+
+A level file is a picture of the bricks, one text line per row:
+
+    # Comment lines start with '#'
+    brick 20 10     # optional: brick width and height in pixels
+    top 40          # optional: y of the first row
+    ..1111..
+    .223322.
+
+'.' (or a space) is a gap; any other character is a brick, and a digit picks
+its color.  Bricks are bucketed into a uniform grid of cells, so finding what
+the ball might hit only looks at the few cells around it, however many
+bricks the level has.  Like engine.py, nothing here imports pygame.
+"""
+import os
+
+import engine
+from collision import circle_rect_toi
+
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'levels')
+DEFAULT_LEVEL_NAME = 'level1'       # Level played unless another one is picked
+DEFAULT_LEVEL = os.path.join(LEVEL_DIR, DEFAULT_LEVEL_NAME + '.txt')
+BRICK_WIDTH, BRICK_HEIGHT = 20, 10  # Default brick size
+LEVEL_TOP = 40                      # Default y of the first row of bricks
+CELL_SIZE = 40                      # Side of one grid cell in pixels
+
+
+def level_path(name):
+    """Return the file of a level given by name (a file in levels/, '.txt' optional) or by path."""
+    if os.path.exists(name):
+        return name
+    if not name.endswith('.txt'):
+        name += '.txt'
+    return os.path.join(LEVEL_DIR, name)
+
+
+def load_level(path=DEFAULT_LEVEL):
+    """Read a level file and return its bricks as (left, top, right, bottom, color) tuples."""
+    brick_width, brick_height, level_top = BRICK_WIDTH, BRICK_HEIGHT, LEVEL_TOP
+    bricks = []
+    row = 0
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].rstrip()
+            if line.startswith('brick '):
+                brick_width, brick_height = (int(value) for value in line.split()[1:3])
+            elif line.startswith('top '):
+                level_top = int(line.split()[1])
+            elif line:
+                top = level_top + row * brick_height
+                for column, char in enumerate(line):
+                    if char not in '. ':
+                        left = column * brick_width
+                        color = int(char) if char.isdigit() else 0
+                        bricks.append((left, top, left + brick_width, top + brick_height, color))
+                row += 1
+    return bricks
+
+
+class UniformGrid:
+    """Buckets of item indices for each CELL_SIZE square cell of the playfield."""
+
+    def __init__(self, width, height, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.columns = width // cell_size + 1
+        self.rows = height // cell_size + 1
+        self.cells = [[] for _ in range(self.columns * self.rows)]
+
+    def _range(self, low, high, count):
+        return max(0, int(low // self.cell_size)), min(count - 1, int(high // self.cell_size))
+
+    def insert(self, index, left, top, right, bottom):
+        """Add an item to every cell its rectangle overlaps."""
+        first_column, last_column = self._range(left, right, self.columns)
+        first_row, last_row = self._range(top, bottom, self.rows)
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                self.cells[row * self.columns + column].append(index)
+
+    def query(self, left, top, right, bottom):
+        """Return the indices in the cells a rectangle overlaps (an item may repeat)."""
+        first_column, last_column = self._range(left, right, self.columns)
+        first_row, last_row = self._range(top, bottom, self.rows)
+        found = []
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                found += self.cells[row * self.columns + column]
+        return found
+
+
+class BrickField:
+    """The bricks of a level, which ones are still standing, and their grid."""
+
+    def __init__(self, bricks, width, height, cell_size=CELL_SIZE):
+        self.bricks = bricks  # (left, top, right, bottom, color) per brick
+        self.alive = bytearray(len(bricks))
+        self.grid = UniformGrid(width, height, cell_size)
+        for index, (left, top, right, bottom, _) in enumerate(bricks):
+            self.grid.insert(index, left, top, right, bottom)
+        self.destroyed = []  # Bricks broken since the renderer last looked
+        self.generation = 0  # Bumped whenever the level is stood back up
+        self.reset()
+
+    def reset(self):
+        """Stand every brick back up."""
+        self.alive[:] = b'\x01' * len(self.bricks)
+        self.remaining = len(self.bricks)
+        self.destroyed.clear()
+        self.generation += 1
+
+    def toi(self, x, y, vx, vy, radius):
+        """Earliest hit of a moving ball with a standing brick, as (t, nx, ny, index), or None."""
+        left = min(x, x + vx) - radius
+        right = max(x, x + vx) + radius
+        top = min(y, y + vy) - radius
+        bottom = max(y, y + vy) + radius
+        best = None
+        alive = self.alive
+        bricks = self.bricks
+        for index in self.grid.query(left, top, right, bottom):
+            if not alive[index]:
+                continue
+            brick_left, brick_top, brick_right, brick_bottom, _ = bricks[index]
+            if brick_left > right or brick_right < left or brick_top > bottom or brick_bottom < top:
+                continue  # Outside the area swept by the ball this tick
+            hit = circle_rect_toi(x, y, vx, vy, radius, brick_left, brick_top, brick_right, brick_bottom)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = (*hit, index)
+        return best
+
+    def destroy(self, index):
+        self.alive[index] = 0
+        self.remaining -= 1
+        self.destroyed.append(index)
+
+    def take_destroyed(self):
+        """Return and forget the bricks broken since the last call."""
+        destroyed, self.destroyed = self.destroyed, []
+        return destroyed
+
+
+def step(state, field, inputs=0):
+    """Advance a brick-breaker game by one tick and return the EVENT_* bits.
+
+    Clearing every brick stands the level back up and play carries on.
+    """
+    events = engine.step(state, inputs, field)
+    if not field.remaining:
+        field.reset()
+    return events
@@ -0,0 +1,37 @@
+from collections import OrderedDict  # Ordered mapping used to track least recently used entries
+
+
+class LRUCache:
+    """Small least-recently-used cache for pre-rendered surfaces."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, factory):
+        """Return the cached value for key, building it with factory() on a miss."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = factory()
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)  # Evict the least recently used entry
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)  # Mark entry as most recently used
+        return value
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
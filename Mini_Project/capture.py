@@ -0,0 +1,161 @@
+"""Gameplay video capture on a background encoder thread.
+
+grab(surface) copies the pixels of a presented frame straight from the
+surface's buffer into one of a few preallocated byte buffers (one memcpy, no
+Python lists or per-pixel objects) and hands it to an encoder thread through
+a bounded queue.  The encoder either pipes raw frames to ffmpeg (for .mp4,
+.mkv, .webm, ... outputs) or writes a numbered PNG sequence into a directory.
+
+Frames are grabbed at a fixed capture rate, independent of the render frame
+rate.  When the encoder falls behind and no buffer is free, the frame is
+dropped instead of making the game wait; the encoder repeats the previous
+frame in its place (another copy of the last PNG, for a PNG sequence), so
+the footage keeps real-time speed and the PNG numbers have no holes, which
+ffmpeg's image sequence input would stop at.
+"""
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import zlib
+
+import numpy as np
+
+CAPTURE_FPS = 30       # Frames per second written to the video
+CAPTURE_BUFFERS = 8    # Frames that can wait for the encoder before new ones are dropped
+PNG_COMPRESSION = 1    # Fast zlib level for PNG frames (zlib runs without holding the GIL)
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.mov', '.avi')
+
+
+def write_png(path, rgb):
+    """Write an (height, width, 3) uint8 array as a PNG file."""
+    height, width, _ = rgb.shape
+    scanlines = np.zeros((height, 1 + width * 3), dtype=np.uint8)  # Filter byte 0 in front of every row
+    scanlines[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(scanlines, PNG_COMPRESSION)))
+        f.write(chunk(b'IEND', b''))
+
+
+class FrameCapture:
+    """Grab presented frames and encode them on a background thread."""
+
+    def __init__(self, path, size, shifts, fps=CAPTURE_FPS, buffers=CAPTURE_BUFFERS):
+        self.path = path
+        self.width, self.height = size
+        self.fps = fps
+        self.frames = 0    # Frames grabbed
+        self.dropped = 0   # Frames skipped because the encoder was behind
+        # Byte offsets of red, green and blue inside each 32-bit pixel (little-endian)
+        self._channels = [shift // 8 for shift in shifts[:3]]
+        self._free = queue.Queue()
+        self._frames = queue.Queue()
+        self._buffers = [bytearray(self.width * self.height * 4) for _ in range(buffers)]
+        for buffer in self._buffers:
+            self._free.put(buffer)
+        self._start = None
+        self._last_index = -1
+        self._process = None
+        if path.lower().endswith(VIDEO_EXTENSIONS):
+            self._process = self._start_ffmpeg()
+        else:
+            os.makedirs(path, exist_ok=True)
+        self._thread = threading.Thread(target=self._encode, name='frame-encoder', daemon=True)
+        self._thread.start()
+
+    def _start_ffmpeg(self):
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg not found; capture to a directory to get a PNG sequence instead")
+        layout = ['0'] * 4
+        for channel, offset in zip('rgb', self._channels):
+            layout[offset] = channel
+        return subprocess.Popen(
+            [ffmpeg, '-loglevel', 'error', '-y',
+             '-f', 'rawvideo', '-pix_fmt', ''.join(layout), '-s', f'{self.width}x{self.height}',
+             '-r', str(self.fps), '-i', '-',
+             '-pix_fmt', 'yuv420p', self.path],
+            stdin=subprocess.PIPE)
+
+    def grab(self, surface):
+        """Copy the surface into a free buffer if a capture frame is due; never blocks."""
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+        index = int((now - self._start) * self.fps)
+        if index <= self._last_index:
+            return  # Not time for the next video frame yet
+        self._last_index = index
+        try:
+            buffer = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1  # Encoder is behind: skip this frame rather than stall the game
+            return
+        view = surface.get_view('2')  # Locks the surface until released
+        pixels = np.frombuffer(buffer, dtype=np.uint32).reshape(self.width, self.height, order='F')
+        pixels[...] = view  # One strided copy straight from the surface's memory
+        del view
+        self.frames += 1
+        self._frames.put((index, buffer))
+
+    def _encode(self):
+        previous = None  # Last buffer sent to ffmpeg, repeated for dropped frames
+        previous_path = None  # Last PNG written, copied for dropped frames
+        previous_index = -1
+        failed = False
+        while True:
+            item = self._frames.get()
+            if item is None:
+                break
+            index, buffer = item
+            if failed:
+                self._free.put(buffer)
+                continue
+            try:
+                if self._process is None:
+                    # Fill the gap with copies of the last frame, since ffmpeg stops reading a PNG sequence at a hole
+                    for missing in range(previous_index + 1 if previous_path else index, index):
+                        shutil.copyfile(previous_path, self._png_path(missing))
+                    pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(self.height, self.width, 4)
+                    previous_path = self._png_path(index)
+                    previous_index = index
+                    write_png(previous_path, pixels[:, :, self._channels])
+                else:
+                    for _ in range(index - previous_index - 1 if previous is not None else 0):
+                        self._process.stdin.write(previous)  # Fill the gap left by dropped frames
+                    self._process.stdin.write(buffer)
+            except (OSError, ValueError) as error:
+                print(f"Capture stopped: {error}")
+                failed = True
+            if self._process is None or failed:
+                self._free.put(buffer)
+                continue
+            if previous is not None:
+                self._free.put(previous)
+            previous, previous_index = buffer, index
+        if previous is not None:
+            self._free.put(previous)
+
+    def _png_path(self, index):
+        return os.path.join(self.path, f"frame_{index:06d}.png")
+
+    def close(self):
+        """Finish encoding the queued frames and close the output."""
+        self._frames.put(None)
+        self._thread.join()
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass  # ffmpeg already exited; its error was printed
+            self._process.wait()
+        print(f"Captured {self.frames} frames to {self.path} ({self.dropped} dropped)")
@@ -0,0 +1,128 @@
+"""Swept-circle collision detection for fast balls.
+
+The discrete checks in engine.step move the ball a whole tick and then test
+for overlap, so a ball that travels further than the paddle is thick in one
+tick can pass straight through it, and a ball left inside a wall flips
+direction every tick.  The functions here find the exact fraction of the
+tick at which the moving circle first touches a wall or the paddle rectangle
+(its faces or rounded corners), bounce it there and carry on with the rest
+of the tick.  Positions and displacements are in pixels; times are fractions
+of one tick, from 0 to 1.
+"""
+import math
+
+MAX_BOUNCES = 4  # Most bounces resolved within one tick
+
+
+def wall_toi(position, velocity, low, high):
+    """Time the center reaches the low or high bound while moving toward it, or None."""
+    if velocity < 0:
+        return max(0.0, (low - position) / velocity)
+    if velocity > 0:
+        return max(0.0, (high - position) / velocity)
+    return None
+
+
+def circle_rect_toi(x, y, vx, vy, radius, left, top, right, bottom):
+    """Time of impact of a moving circle with a rectangle.
+
+    Returns (t, nx, ny) with the unit normal of the surface that was hit, or
+    None if the circle doesn't touch the rectangle while moving toward it.
+    A circle that already overlaps the rectangle hits it at t = 0.
+    """
+    # Already touching: push back out along the closest point
+    closest_x = min(max(x, left), right)
+    closest_y = min(max(y, top), bottom)
+    offset_x, offset_y = x - closest_x, y - closest_y
+    distance = math.hypot(offset_x, offset_y)
+    if distance < radius:
+        if distance == 0:
+            nx, ny = 0.0, -1.0  # Center inside the rectangle: treat as a hit from above
+        else:
+            nx, ny = offset_x / distance, offset_y / distance
+        return (0.0, nx, ny) if vx * nx + vy * ny < 0 else None
+
+    best = None
+
+    # Faces, pushed out by the radius
+    if vy > 0:
+        t = (top - radius - y) / vy
+        if 0 <= t and left <= x + vx * t <= right:
+            best = (t, 0.0, -1.0)
+    elif vy < 0:
+        t = (bottom + radius - y) / vy
+        if 0 <= t and left <= x + vx * t <= right:
+            best = (t, 0.0, 1.0)
+    if vx > 0:
+        t = (left - radius - x) / vx
+        if 0 <= t and top <= y + vy * t <= bottom and (best is None or t < best[0]):
+            best = (t, -1.0, 0.0)
+    elif vx < 0:
+        t = (right + radius - x) / vx
+        if 0 <= t and top <= y + vy * t <= bottom and (best is None or t < best[0]):
+            best = (t, 1.0, 0.0)
+
+    # Corners, as circles of the ball's radius
+    a = vx * vx + vy * vy
+    if a:
+        for corner_x, corner_y in ((left, top), (right, top), (left, bottom), (right, bottom)):
+            px, py = x - corner_x, y - corner_y
+            b = px * vx + py * vy
+            if b >= 0:
+                continue  # Moving away from this corner
+            discriminant = b * b - a * (px * px + py * py - radius * radius)
+            if discriminant < 0:
+                continue
+            t = (-b - math.sqrt(discriminant)) / a
+            if 0 <= t and (best is None or t < best[0]):
+                best = (t, (px + vx * t) / radius, (py + vy * t) / radius)
+    return best
+
+
+def reflect(vx, vy, nx, ny):
+    """Mirror a velocity about the surface with unit normal (nx, ny)."""
+    dot = vx * nx + vy * ny
+    return vx - 2 * dot * nx, vy - 2 * dot * ny
+
+
+def sweep_ball(x, y, vx, vy, radius, width, paddle_rect, obstacles=None, max_bounces=MAX_BOUNCES):
+    """Move a ball by (vx, vy) for one tick, bouncing off walls and the paddle on the way.
+
+    paddle_rect is (left, top, right, bottom).  obstacles, if given, is an
+    object with toi(x, y, vx, vy, radius) -> (t, nx, ny, index) or None and
+    destroy(index), such as bricks.BrickField; an obstacle is destroyed when
+    the ball bounces off it.  Returns the new position and displacement plus
+    the list of surfaces hit, each 'wall', 'top', 'paddle' (from above),
+    'paddle_side' or 'brick'.
+    """
+    hits = []
+    remaining = 1.0
+    for _ in range(max_bounces + 1):
+        # Earliest contact within what is left of the tick
+        earliest, surface, normal = remaining, None, None
+        t = wall_toi(x, vx, radius, width - radius)
+        if t is not None and t <= earliest:
+            earliest, surface, normal = t, 'wall', (-1.0 if vx > 0 else 1.0, 0.0)
+        if vy < 0:
+            t = max(0.0, (radius - y) / vy)
+            if t <= earliest:
+                earliest, surface, normal = t, 'top', (0.0, 1.0)
+        paddle = circle_rect_toi(x, y, vx * remaining, vy * remaining, radius, *paddle_rect)
+        if paddle is not None and paddle[0] * remaining <= earliest:
+            earliest, normal = paddle[0] * remaining, paddle[1:]
+            surface = 'paddle' if normal[1] < 0 else 'paddle_side'
+        if obstacles is not None:
+            hit = obstacles.toi(x, y, vx * remaining, vy * remaining, radius)
+            if hit is not None and hit[0] * remaining <= earliest:
+                earliest, surface, normal, obstacle = hit[0] * remaining, 'brick', hit[1:3], hit[3]
+
+        x += vx * earliest
+        y += vy * earliest
+        remaining -= earliest
+        if surface is None:
+            break
+        if surface == 'brick':
+            obstacles.destroy(obstacle)
+        vx, vy = reflect(vx, vy, *normal)
+        hits.append(surface)
+    return x, y, vx, vy, hits
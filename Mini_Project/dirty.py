@@ -0,0 +1,57 @@
+import pygame  # Import Pygame library for display updates
+
+MAX_DIRTY_RECTS = 64  # More changed regions than this in one frame and a full flip is cheaper
+
+
+class DirtyRenderer:
+    """Push only the screen regions that changed instead of flipping the whole window.
+
+    Each frame starts with begin(background).  When the background surface is
+    the same one as last frame, only the regions drawn last frame are restored
+    from it; otherwise the whole background is blitted and the frame is
+    presented with a full flip.  Everything drawn on top is recorded with add()
+    and present() updates the union of last frame's and this frame's regions.
+
+    display is what gets flipped or updated: pygame.display by default, or
+    anything with the same flip() and update(rects), like presenter.ScaledDisplay.
+    """
+
+    def __init__(self, screen, enabled=True, max_rects=MAX_DIRTY_RECTS, display=pygame.display):
+        self.screen = screen
+        self.display = display
+        self.enabled = enabled
+        self.max_rects = max_rects
+        self._background = None
+        self._previous = []  # Regions drawn on top of the background last frame
+        self._current = []   # Regions drawn on top of the background this frame
+        self._full = True
+
+    def invalidate(self):
+        """Force the next frame to redraw and flip the whole screen (e.g. after a menu)."""
+        self._background = None
+
+    def begin(self, background):
+        """Start a frame over the given full-screen background surface."""
+        self._full = not self.enabled or background is not self._background
+        if self._full:
+            self.screen.blit(background, (0, 0))
+        else:
+            for rect in self._previous:
+                self.screen.blit(background, rect, rect)  # Erase last frame's sprites
+        self._background = background
+
+    def add(self, rect):
+        """Record a region drawn this frame; returns the rect for chaining."""
+        self._current.append(rect)
+        return rect
+
+    def add_all(self, rects):
+        self._current.extend(rects)
+
+    def present(self):
+        """Show this frame with a full flip or an update of the changed regions only."""
+        if self._full or len(self._previous) + len(self._current) > self.max_rects:
+            self.display.flip()
+        else:
+            self.display.update(self._previous + self._current)
+        self._previous, self._current = self._current, []
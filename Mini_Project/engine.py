@@ -0,0 +1,246 @@
+"""Headless game engine for the bouncing ball game.
+
+The whole game state lives in a GameState object and advances one tick at a
+time through step(state, inputs).  Nothing here imports pygame, so the physics
+can run without a window, a clock or the menus (see sim.py).
+
+Speeds are given in pixels per tick at BASE_TICK_RATE and scaled to the
+configured tick_rate, so changing the tick rate does not change gameplay.
+"""
+import random  # Import random for seeded launch directions and colors
+from dataclasses import dataclass
+
+from collision import sweep_ball  # Exact time-of-impact collisions for fast balls
+
+# Constants for game window dimensions
+WIDTH, HEIGHT = 600, 400               # Screen width and height
+RADIUS = 20                            # Ball radius
+PADDLE_WIDTH, PADDLE_HEIGHT = 100, 10  # Default paddle dimensions
+PADDLE_SPEED = 8                       # Paddle movement speed
+COLOR_SPEED = 2                        # Background color transition speed
+BASE_TICK_RATE = 60                    # Tick rate the speeds above are tuned for
+
+skill_levels = {
+    'Beginner': {'paddle_width': 120, 'ball_speed': 4},
+    'Intermediate': {'paddle_width': 100, 'ball_speed': 6},
+    'Expert': {'paddle_width': 80, 'ball_speed': 8},
+    'Expert+': {'paddle_width': 70, 'ball_speed': 16, 'continuous_collision': True},
+}
+
+MULTI_BALL_RADIUS = 6  # Smaller balls so hundreds fit on screen
+BRICK_BALL_RADIUS = 8  # Smaller ball to fit between bricks
+game_modes = {
+    'Classic': {},
+    'Multi-Ball': {'radius': MULTI_BALL_RADIUS},
+    'Bricks': {'radius': BRICK_BALL_RADIUS, 'continuous_collision': True},
+}
+
+# Input bits passed to step()
+INPUT_LEFT = 1    # Move paddle left
+INPUT_RIGHT = 2   # Move paddle right
+INPUT_LAUNCH = 4  # Launch the ball
+INPUT_TOGGLE_MUSIC = 8   # Toggle background music (ignored by step, kept for replays)
+INPUT_TOGGLE_SOUND = 16  # Toggle sound effects (ignored by step, kept for replays)
+
+# Event bits returned by step()
+EVENT_WALL = 1       # Ball bounced off the left or right wall
+EVENT_TOP = 2        # Ball bounced off the top wall
+EVENT_PADDLE = 4     # Ball bounced off the paddle
+EVENT_GAME_OVER = 8  # Ball fell below the paddle
+EVENT_BRICK = 16     # Ball broke a brick (see bricks.py)
+
+
+@dataclass
+class GameConfig:
+    """Dimensions and speeds the physics runs with."""
+    width: int = WIDTH
+    height: int = HEIGHT
+    radius: int = RADIUS
+    paddle_width: int = PADDLE_WIDTH
+    paddle_height: int = PADDLE_HEIGHT
+    paddle_speed: int = PADDLE_SPEED
+    ball_speed: int = skill_levels['Beginner']['ball_speed']
+    tick_rate: int = BASE_TICK_RATE
+    continuous_collision: bool = False  # Swept collisions (collision.py), needed once the ball outruns the paddle
+
+    @property
+    def paddle_y(self):
+        return self.height - self.paddle_height - 10  # Paddle sits near bottom of screen
+
+    @property
+    def tick_scale(self):
+        """Distance multiplier for one tick relative to BASE_TICK_RATE."""
+        return BASE_TICK_RATE / self.tick_rate
+
+    @classmethod
+    def for_skill(cls, skill, mode='Classic', **overrides):
+        """Build the configuration for an entry in skill_levels and game_modes."""
+        options = dict(skill_levels[skill])
+        options.update(game_modes[mode])
+        options.update(overrides)
+        return cls(**options)
+
+
+def random_color(rng):
+    return tuple(rng.choices(range(256), k=3))
+
+
+# Smoothly transition colors for background
+def smooth_color_transition(current, target, speed=1):
+    return tuple(min(255, max(0, current[i] + (speed if current[i] < target[i] else -speed))) for i in range(3))
+
+
+class GameState:
+    """Complete state of one game, advanced by step()."""
+
+    def __init__(self, config=None, seed=None):
+        self.config = config or GameConfig()
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self, config=None, seed=None):
+        """Put the ball back on a centered paddle and pick new colors.
+
+        Passing a seed restarts the random number generator, so the game
+        that follows can be replayed exactly from its inputs.
+        """
+        if config is not None:
+            self.config = config
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+        cfg = self.config
+        self.paddle_x = (cfg.width - cfg.paddle_width) // 2  # Center paddle horizontally
+        self.x = self.paddle_x + cfg.paddle_width // 2      # Start above paddle center
+        self.y = cfg.paddle_y - cfg.radius
+        self.dx, self.dy = 0, 0  # Ball starts stationary
+        self.prev_x, self.prev_y, self.prev_paddle_x = self.x, self.y, self.paddle_x  # Positions one tick ago
+        self.score = 0
+        self.ball_launched = False
+        self.game_over = False
+        self.ticks = 0
+        self.background_color = random_color(self.rng)  # Top color of the gradient background
+        self.target_color = random_color(self.rng)      # Target color for smooth transition
+
+
+    def interpolate(self, alpha):
+        """Return (x, y, paddle_x) blended between the last two ticks for drawing."""
+        return (
+            self.prev_x + (self.x - self.prev_x) * alpha,
+            self.prev_y + (self.y - self.prev_y) * alpha,
+            self.prev_paddle_x + (self.paddle_x - self.prev_paddle_x) * alpha,
+        )
+
+
+def move_paddle(state, inputs):
+    """Move the paddle within screen bounds according to the INPUT_* bits."""
+    cfg = state.config
+    state.prev_paddle_x = state.paddle_x
+    if inputs & INPUT_LEFT:
+        state.paddle_x = max(0, state.paddle_x - cfg.paddle_speed * cfg.tick_scale)
+    if inputs & INPUT_RIGHT:
+        state.paddle_x = min(cfg.width - cfg.paddle_width, state.paddle_x + cfg.paddle_speed * cfg.tick_scale)
+
+
+def update_colors(state, events):
+    """Pick a new target color on any bounce and move the background toward it."""
+    if events & (EVENT_WALL | EVENT_TOP | EVENT_PADDLE | EVENT_BRICK):
+        state.target_color = random_color(state.rng)  # Change background target color
+
+    # Update gradient background color
+    state.background_color = smooth_color_transition(state.background_color, state.target_color, speed=COLOR_SPEED)
+    if state.background_color == state.target_color:
+        state.target_color = random_color(state.rng)  # Update target color if transition complete
+
+
+def sweep(state, obstacles=None):
+    """Move the ball one tick with swept collisions and return the EVENT_* bits.
+
+    Unlike the discrete checks in step(), the ball can't pass through the
+    paddle or get stuck in a wall however far it moves in one tick.
+    obstacles are passed on to collision.sweep_ball (e.g. a bricks.BrickField).
+    """
+    cfg = state.config
+    paddle_rect = (state.paddle_x, cfg.paddle_y, state.paddle_x + cfg.paddle_width, cfg.paddle_y + cfg.paddle_height)
+    scale = cfg.tick_scale
+    state.x, state.y, vx, vy, hits = sweep_ball(
+        state.x, state.y, state.dx * scale, state.dy * scale, cfg.radius, cfg.width, paddle_rect, obstacles)
+    state.dx, state.dy = vx / scale, vy / scale
+
+    events = 0
+    for surface in hits:
+        if surface == 'wall' or surface == 'paddle_side':
+            events |= EVENT_WALL
+        elif surface == 'top':
+            events |= EVENT_TOP
+        elif surface == 'brick':
+            state.score += 1  # One point per brick broken
+            events |= EVENT_BRICK
+        else:
+            state.score += 1  # Ball bounced off the top of the paddle
+            events |= EVENT_PADDLE
+
+    # Game over if ball falls below the paddle
+    if state.y + cfg.radius >= cfg.height:
+        state.game_over = True
+        state.dy = 0
+        events |= EVENT_GAME_OVER
+    return events
+
+
+def step(state, inputs=0, obstacles=None):
+    """Advance the game by one tick and return the EVENT_* bits that occurred.
+
+    Obstacles (see sweep()) are only collided with when the ball uses
+    continuous collision.
+    """
+    cfg = state.config
+    events = 0
+    state.ticks += 1
+    state.prev_x, state.prev_y = state.x, state.y
+
+    if inputs & INPUT_LAUNCH and not state.ball_launched and not state.game_over:
+        state.dx = state.rng.choice([-cfg.ball_speed, cfg.ball_speed])
+        state.dy = -cfg.ball_speed
+        state.ball_launched = True
+
+    move_paddle(state, inputs)
+
+    if not state.game_over:
+        if state.ball_launched and cfg.continuous_collision:
+            events |= sweep(state, obstacles)
+        elif state.ball_launched:
+            state.x += state.dx * cfg.tick_scale
+            state.y += state.dy * cfg.tick_scale
+
+            # Ball collision with left and right walls
+            if state.x - cfg.radius <= 0 or state.x + cfg.radius >= cfg.width:
+                state.dx = -state.dx
+                events |= EVENT_WALL
+
+            # Ball collision with the top wall
+            if state.y - cfg.radius <= 0:
+                state.dy = -state.dy
+                events |= EVENT_TOP
+
+            # Ball collision with the paddle
+            paddle_y = cfg.paddle_y
+            if (state.dy > 0 and state.y + cfg.radius >= paddle_y
+                    and state.paddle_x <= state.x <= state.paddle_x + cfg.paddle_width):
+                state.dy = -state.dy
+                state.score += 1
+                events |= EVENT_PADDLE
+
+            # Game over if ball falls below the paddle
+            if state.y + cfg.radius >= cfg.height:
+                state.game_over = True
+                state.dy = 0
+                events |= EVENT_GAME_OVER
+        else:
+            # Ball rests above the center of the paddle until launched
+            state.x = state.paddle_x + cfg.paddle_width // 2
+            state.y = cfg.paddle_y - cfg.radius
+
+    update_colors(state, events)
+    return events
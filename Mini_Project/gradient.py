@@ -0,0 +1,48 @@
+import numpy as np
+import pygame  # Import Pygame library for surfaces and pixel arrays
+
+from cache import LRUCache
+
+GRADIENT_QUANTUM = 4     # Colors are snapped to multiples of this before caching
+GRADIENT_CACHE_SIZE = 64  # Number of ready-made gradient surfaces kept around
+
+
+def quantize_color(color, quantum=GRADIENT_QUANTUM):
+    """Snap an RGB color to the cache grid so nearby colors share a surface."""
+    return tuple(min(255, (int(c) + quantum // 2) // quantum * quantum) for c in color[:3])
+
+
+def build_gradient_surface(color1, color2, size):
+    """Build a vertical gradient surface from color1 (top) to color2 (bottom).
+
+    The gradient is computed once as a column of packed pixels with NumPy and
+    copied into every column of the surface, instead of drawing one line per row.
+    """
+    height = size[1]
+    display = pygame.display.get_surface()
+    surface = pygame.Surface(size, 0, display) if display is not None else pygame.Surface(size, 0, 32)
+    ratio = (np.arange(height) / height)[:, None]  # Gradual color blending ratio per row
+    column = (np.array(color1[:3], dtype=float) * (1 - ratio)
+              + np.array(color2[:3], dtype=float) * ratio).astype(np.uint32)
+    red_shift, green_shift, blue_shift, _ = surface.get_shifts()
+    pixels = pygame.surfarray.pixels2d(surface)  # Locks the surface until released
+    pixels[:] = (column[:, 0] << red_shift) | (column[:, 1] << green_shift) | (column[:, 2] << blue_shift)
+    del pixels
+    return surface
+
+
+class GradientCache:
+    """LRU cache of full-screen gradient surfaces keyed by quantized colors."""
+
+    def __init__(self, size, maxsize=GRADIENT_CACHE_SIZE, quantum=GRADIENT_QUANTUM):
+        self.size = size
+        self.quantum = quantum
+        self._cache = LRUCache(maxsize)
+
+    def get(self, color1, color2):
+        """Return a ready gradient surface for the given pair of colors."""
+        key = (quantize_color(color1, self.quantum), quantize_color(color2, self.quantum))
+        return self._cache.get(key, lambda: build_gradient_surface(key[0], key[1], self.size))
+
+    def clear(self):
+        self._cache.clear()
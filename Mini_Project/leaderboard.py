@@ -0,0 +1,153 @@
+"""In-memory leaderboard with write-behind persistence.
+
+Scores are loaded from disk once into one bounded min-heap per board (one
+board per skill level) and every read is served from memory.  New entries
+are appended to the leaderboard file by a background thread, so the game
+never waits on disk I/O; once the log grows, the thread compacts it by
+atomically replacing the file with the current top scores.
+
+File format, one entry per line:
+
+    <board>\t<name>\t<score>
+
+Lines holding only a number (the old format) are loaded into DEFAULT_BOARD.
+"""
+import atexit
+import heapq
+import os
+import queue
+import threading
+
+TOP_K = 5                  # Scores kept per board
+DEFAULT_BOARD = 'Beginner'  # Board that old, board-less scores belong to
+DEFAULT_NAME = 'Player'
+COMPACT_AFTER = 64         # Appended lines tolerated before the file is compacted
+
+
+def clean_field(text):
+    """Make text safe to store in one tab-separated field."""
+    return ' '.join(str(text).split()) or DEFAULT_NAME
+
+
+class Leaderboard:
+    """Top-K scores per board, persisted by a background writer thread."""
+
+    def __init__(self, path, top_k=TOP_K, compact_after=COMPACT_AFTER):
+        self.path = path
+        self.top_k = top_k
+        self.compact_after = compact_after
+        self._boards = {}   # board -> min-heap of (score, -sequence, name)
+        self._sorted = {}   # board -> cached [(name, score), ...] best first
+        self._sequence = 0  # Insertion counter; earlier entries win ties
+        self._log_lines = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._load()
+        self._writer = threading.Thread(target=self._write_loop, name='leaderboard-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # Reading
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) == 1 and fields[0].strip().isdigit():
+                    self._insert(DEFAULT_BOARD, DEFAULT_NAME, int(fields[0]))
+                elif len(fields) == 3 and fields[2].strip().isdigit():
+                    self._insert(fields[0], fields[1], int(fields[2]))
+                else:
+                    continue  # Skip blank or damaged lines
+                self._log_lines += 1
+
+    def top(self, board=DEFAULT_BOARD):
+        """Return [(name, score), ...] for a board, best first."""
+        entries = self._sorted.get(board)
+        if entries is None:
+            heap = self._boards.get(board, [])
+            entries = [(name, score) for score, _, name in sorted(heap, reverse=True)]
+            self._sorted[board] = entries
+        return entries
+
+    def boards(self):
+        """Return the names of all boards that hold scores."""
+        return list(self._boards)
+
+    def qualifies(self, board, score):
+        """Return True if score would make it onto the board."""
+        heap = self._boards.get(board, [])
+        return len(heap) < self.top_k or score > heap[0][0]
+
+    # Writing
+
+    def _insert(self, board, name, score):
+        heap = self._boards.setdefault(board, [])
+        self._sequence += 1
+        entry = (score, -self._sequence, name)
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)  # Drop the lowest score
+        else:
+            return False
+        self._sorted.pop(board, None)
+        return True
+
+    def submit(self, board, name, score):
+        """Record a score; returns True if it made the board.
+
+        The in-memory board is updated immediately; the file is updated later
+        by the writer thread.
+        """
+        board, name = clean_field(board), clean_field(name)
+        with self._lock:
+            if not self._insert(board, name, score):
+                return False
+            self._log_lines += 1
+            if self._log_lines > self.compact_after:
+                self._queue.put(('compact', self._snapshot()))
+                self._log_lines = sum(len(heap) for heap in self._boards.values())
+            else:
+                self._queue.put(('append', f"{board}\t{name}\t{score}\n"))
+        return True
+
+    def _snapshot(self):
+        lines = []
+        for board, heap in self._boards.items():
+            for score, _, name in sorted(heap, key=lambda entry: (-entry[0], -entry[1])):
+                lines.append(f"{board}\t{name}\t{score}\n")
+        return ''.join(lines)
+
+    def _write_loop(self):
+        while True:
+            action, payload = self._queue.get()
+            try:
+                if action == 'append':
+                    with open(self.path, 'a') as f:
+                        f.write(payload)
+                elif action == 'compact':
+                    temp_path = self.path + '.tmp'
+                    with open(temp_path, 'w') as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.path)  # Atomic swap; readers never see a half-written file
+                elif action == 'stop':
+                    return
+            except OSError as error:
+                print(f"Could not save leaderboard: {error}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued write has reached the file."""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(('stop', None))
+            self._writer.join()
@@ -0,0 +1,119 @@
+"""Multi-ball mode: many balls stored in NumPy arrays and moved in batches.
+
+Positions and velocities live in contiguous (capacity, 2) float arrays and
+every wall, top and paddle collision is resolved for all balls at once with
+boolean masks, so the cost per tick barely depends on the number of balls.
+"""
+import numpy as np
+
+from engine import (
+    move_paddle, update_colors,
+    INPUT_LAUNCH, EVENT_WALL, EVENT_TOP, EVENT_PADDLE, EVENT_GAME_OVER,
+)
+
+MULTI_BALL_COUNT = 500   # Balls launched at once in multi-ball mode
+
+
+class BallArray:
+    """Positions, velocities and alive flags for up to `capacity` balls."""
+
+    def __init__(self, capacity=MULTI_BALL_COUNT):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2))         # x, y of every ball
+        self.vel = np.zeros((capacity, 2))         # dx, dy of every ball
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.prev_pos = np.zeros((capacity, 2))    # Positions one tick ago, for interpolation
+
+    def clear(self):
+        self.alive[:] = False
+        self.vel[:] = 0
+
+    def interpolate(self, alpha):
+        """Return the positions of live balls blended between the last two ticks."""
+        prev, pos = self.prev_pos[self.alive], self.pos[self.alive]
+        return prev + (pos - prev) * alpha
+
+    @property
+    def count(self):
+        return int(np.count_nonzero(self.alive))
+
+    def launch(self, x, y, speed, rng):
+        """Launch every ball from (x, y) in a random upward direction."""
+        self.pos[:, 0] = x
+        self.pos[:, 1] = y
+        angles = rng.uniform(np.pi * 0.15, np.pi * 0.85, self.capacity)  # Upward fan of directions
+        self.vel[:, 0] = np.cos(angles) * speed * np.sqrt(2)
+        self.vel[:, 1] = -np.sin(angles) * speed * np.sqrt(2)
+        self.prev_pos[:] = self.pos
+        self.alive[:] = True
+
+    def step(self, config, paddle_x):
+        """Move all live balls one tick and return (wall, top, paddle, lost) masks."""
+        pos, vel, alive = self.pos, self.vel, self.alive
+        np.copyto(self.prev_pos, pos)
+        if config.tick_scale == 1:
+            pos += vel  # Dead balls have zero velocity and stay put
+        else:
+            pos += vel * config.tick_scale
+        x, y = pos[:, 0], pos[:, 1]
+        radius = config.radius
+
+        # Ball collision with left and right walls, only while moving into the wall
+        wall = alive & (((x - radius <= 0) & (vel[:, 0] < 0)) | ((x + radius >= config.width) & (vel[:, 0] > 0)))
+        vel[wall, 0] *= -1
+
+        # Ball collision with the top wall
+        top = alive & (y - radius <= 0) & (vel[:, 1] < 0)
+        vel[top, 1] *= -1
+
+        # Ball collision with the paddle
+        paddle = (alive & (vel[:, 1] > 0) & (y + radius >= config.paddle_y)
+                  & (x >= paddle_x) & (x <= paddle_x + config.paddle_width))
+        vel[paddle, 1] *= -1
+
+        # Balls that fall below the paddle are out of play
+        lost = alive & (y + radius >= config.height)
+        alive[lost] = False
+        vel[lost] = 0
+        return wall, top, paddle, lost
+
+
+def step(state, balls, inputs=0):
+    """Advance a multi-ball game by one tick and return the EVENT_* bits that occurred.
+
+    state holds the paddle, score and colors exactly as in engine.step; the
+    balls themselves live in the BallArray.
+    """
+    cfg = state.config
+    events = 0
+    state.ticks += 1
+    state.prev_x, state.prev_y = state.x, state.y
+
+    if inputs & INPUT_LAUNCH and not state.ball_launched and not state.game_over:
+        rng = np.random.default_rng(state.rng.getrandbits(32))  # Seeded from the game's RNG
+        balls.launch(state.x, state.y, cfg.ball_speed, rng)
+        state.ball_launched = True
+
+    move_paddle(state, inputs)
+
+    if not state.game_over:
+        if state.ball_launched:
+            wall, top, paddle, lost = balls.step(cfg, state.paddle_x)
+            if wall.any():
+                events |= EVENT_WALL
+            if top.any():
+                events |= EVENT_TOP
+            hits = int(np.count_nonzero(paddle))
+            if hits:
+                state.score += hits  # One point per ball saved by the paddle
+                events |= EVENT_PADDLE
+            if lost.any() and not balls.alive.any():
+                state.game_over = True  # Every ball has fallen below the paddle
+                events |= EVENT_GAME_OVER
+        else:
+            # Balls rest above the center of the paddle until launched
+            state.x = state.paddle_x + cfg.paddle_width // 2
+            state.y = cfg.paddle_y - cfg.radius
+
+    update_colors(state, events)
+    return events
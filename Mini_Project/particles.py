@@ -0,0 +1,101 @@
+"""Particle bursts for bounces and game over, kept in preallocated NumPy arrays.
+
+Every particle lives in one slot of fixed-size position, velocity and life
+arrays; bursts overwrite the oldest slots, and moving, ageing and culling
+happen for all particles at once.  No Python object is created per particle
+except the (sprite, position) pairs handed to Surface.blits when drawing.
+"""
+import numpy as np
+import pygame  # Import Pygame library for the particle sprites
+
+PARTICLE_CAPACITY = 4096  # Most particles alive at once
+PARTICLE_LIFE = 45        # Ticks a particle lives (at BASE_TICK_RATE)
+PARTICLE_GRAVITY = 0.15   # Downward pull per tick
+PARTICLE_SIZE = 4         # Sprite size in pixels
+FADE_LEVELS = 8           # Sprites per color, from faint to opaque
+
+# Burst colors
+PARTICLE_WALL = 0
+PARTICLE_PADDLE = 1
+PARTICLE_GAME_OVER = 2
+PARTICLE_BRICK = 3
+PARTICLE_COLORS = [(255, 255, 255), (255, 215, 80), (255, 70, 50), (120, 220, 255)]
+
+
+def render_particle_sprites(colors=PARTICLE_COLORS, size=PARTICLE_SIZE, levels=FADE_LEVELS):
+    """Render one small round sprite per color and fade level, indexed color * levels + level."""
+    sprites = []
+    for color in colors:
+        for level in range(levels):
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            alpha = 255 * (level + 1) // levels
+            pygame.draw.circle(surface, (*color, alpha), (size / 2, size / 2), size / 2)
+            sprites.append(surface)
+    sprites_array = np.empty(len(sprites), dtype=object)  # For picking sprites with index arrays
+    sprites_array[:] = sprites
+    return sprites_array
+
+
+class ParticlePool:
+    """Positions, velocities, remaining life and color of up to `capacity` particles."""
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)  # Ticks left; 0 = free slot
+        self.color = np.zeros(capacity, dtype=np.intp)
+        self.rng = np.random.default_rng(seed)  # Separate from the game's RNG, so replays are unaffected
+        self._next = 0  # Slot the next burst starts at (oldest particles are overwritten)
+        self._sprites = {}  # Sprite size -> sprites of every color and fade level
+
+    def clear(self):
+        self.life[:] = 0
+
+    @property
+    def active(self):
+        return bool(self.life.any())
+
+    def emit(self, x, y, count, color, speed=4.0, angle=(0, 2 * np.pi)):
+        """Start a burst of `count` particles at (x, y) flying out within an angle range (radians)."""
+        count = min(count, self.capacity)
+        slots = (self._next + np.arange(count)) % self.capacity
+        self._next = (self._next + count) % self.capacity
+        angles = self.rng.uniform(angle[0], angle[1], count)
+        speeds = self.rng.uniform(speed * 0.3, speed, count)
+        self.pos[slots, 0] = x
+        self.pos[slots, 1] = y
+        self.vel[slots, 0] = np.cos(angles) * speeds
+        self.vel[slots, 1] = -np.sin(angles) * speeds  # Screen y points down
+        self.life[slots] = self.rng.uniform(PARTICLE_LIFE * 0.5, PARTICLE_LIFE, count)
+        self.color[slots] = color
+
+    def update(self, ticks):
+        """Move and age every particle by `ticks` (fractional) ticks."""
+        alive = self.life > 0
+        if not alive.any():
+            return
+        self.pos[alive] += self.vel[alive] * ticks
+        self.vel[alive, 1] += PARTICLE_GRAVITY * ticks
+        self.life[alive] -= ticks
+        np.maximum(self.life, 0, out=self.life)
+
+    def draw(self, surface, scale=1.0):
+        """Blit every live particle in one Surface.blits call; returns the rect covering them, or None.
+
+        scale converts particle positions (game coordinates) to the surface's pixels.
+        """
+        alive = np.flatnonzero(self.life)
+        if not len(alive):
+            return None
+        size = max(2, round(PARTICLE_SIZE * scale))
+        if size not in self._sprites:
+            self._sprites[size] = render_particle_sprites(size=size)
+        positions = self.pos[alive] if scale == 1 else self.pos[alive] * scale
+        corners = positions.astype(np.intp) - size // 2
+        levels = np.minimum(FADE_LEVELS - 1, (self.life[alive] * FADE_LEVELS / PARTICLE_LIFE).astype(np.intp))
+        sprites = self._sprites[size][self.color[alive] * FADE_LEVELS + levels]
+        surface.blits(zip(sprites.tolist(), corners.tolist()), doreturn=False)
+        left, top = corners.min(axis=0)
+        right, bottom = corners.max(axis=0) + size
+        return pygame.Rect(int(left), int(top), int(right - left), int(bottom - top)).clip(surface.get_rect())
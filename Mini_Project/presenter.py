@@ -0,0 +1,119 @@
+import pygame  # Import Pygame library for the window and scaling
+
+BORDER_COLOR = (0, 0, 0)  # Bars around the picture when the window's aspect ratio differs
+
+
+class ScaledDisplay:
+    """An offscreen render target shown in a window of any size.
+
+    Everything is drawn to `surface`, which has a fixed render resolution
+    (the game's own unless another render_size is given), so layout and
+    physics never see the window size.  flip() and
+    update(rects) (the same calls as pygame.display) copy it into the window,
+    scaled to fit with pygame.transform.smoothscale (or scale, for sharp
+    pixels) and centered.  Without a window size the window itself is the
+    render target and nothing is copied.
+    """
+
+    def __init__(self, render_size):
+        self.render_size = render_size
+        self.smooth = True
+        self.window = None
+        self.surface = None
+        self._dest = None    # Where the picture goes in the window
+        self._target = None  # Window subsurface the picture is scaled into
+        self._scale = 1.0
+        self._direct = False  # Drawing straight into a window of the render size
+
+    def open(self, window_size=None, fullscreen=False, smooth=True, render_size=None):
+        """Create (or recreate) the window and return the surface to draw on.
+
+        render_size changes the resolution drawn at.  The surface changes
+        when switching between a render-size window and a scaled one, or to
+        another render size, so callers must draw on the returned one.
+        """
+        self.smooth = smooth
+        if render_size is not None and render_size != self.render_size:
+            self.render_size = render_size
+            self.surface = None  # Allocated again at the new size
+        if fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)  # Desktop resolution
+        elif window_size is None:
+            self.window = pygame.display.set_mode(self.render_size)
+            self.surface = self.window  # Draw straight into the window
+            self._direct = True
+            return self.surface
+        else:
+            self.window = pygame.display.set_mode(window_size, pygame.RESIZABLE)
+        if self._direct or self.surface is None:
+            self.surface = pygame.Surface(self.render_size).convert()
+        self._direct = False
+        self._layout()
+        return self.surface
+
+    def resize(self):
+        """Fit the picture to the window again after it changed size."""
+        if not self._direct:
+            self.window = pygame.display.get_surface()
+            self._layout()
+
+    def _layout(self):
+        window_rect = self.window.get_rect()
+        render_width, render_height = self.render_size
+        self._scale = min(window_rect.width / render_width, window_rect.height / render_height)
+        self._dest = pygame.Rect(0, 0, round(render_width * self._scale), round(render_height * self._scale))
+        self._dest.center = window_rect.center
+        self._target = self.window.subsurface(self._dest)
+        self.window.fill(BORDER_COLOR)
+
+    @property
+    def scaled(self):
+        return self._dest.size != self.render_size
+
+    def _copy(self):
+        """Copy the whole render target into the window, scaling it if needed."""
+        if not self.scaled:
+            self._target.blit(self.surface, (0, 0))
+        elif self.smooth:
+            pygame.transform.smoothscale(self.surface, self._dest.size, self._target)
+        else:
+            pygame.transform.scale(self.surface, self._dest.size, self._target)
+
+    def to_window(self, rect):
+        """Map a rect of the render target to the window, rounded outward."""
+        scale = self._scale
+        left = int(rect.left * scale)
+        top = int(rect.top * scale)
+        right = int(rect.right * scale + 1.999)
+        bottom = int(rect.bottom * scale + 1.999)
+        return pygame.Rect(self._dest.x + left, self._dest.y + top, right - left, bottom - top).clip(self._dest)
+
+    def flip(self):
+        if not self._direct:
+            self._copy()
+        pygame.display.flip()
+
+    def update(self, rects):
+        """Show only the given regions of the render target."""
+        if self._direct:
+            pygame.display.update(rects)
+            return
+        bounds = self.surface.get_rect()
+        rects = [pygame.Rect(rect).clip(bounds) for rect in rects]
+        rects = [rect for rect in rects if rect.w and rect.h]  # Off-screen rects clip to 0x0, which subsurface() rejects
+        if self.scaled and not self.smooth and self._scale == int(self._scale):
+            # Whole-number pixel scaling maps every rect exactly, so scale just the changed parts
+            scale = int(self._scale)
+            window_rects = []
+            for rect in rects:
+                target = pygame.Rect(rect.x * scale, rect.y * scale, rect.width * scale, rect.height * scale)
+                pygame.transform.scale(self.surface.subsurface(rect), target.size, self._target.subsurface(target))
+                window_rects.append(target.move(self._dest.topleft))
+            pygame.display.update(window_rects)
+        elif self.scaled:
+            self._copy()  # Scaling just parts of the picture would leave seams between them
+            pygame.display.update([self.to_window(rect) for rect in rects])
+        else:
+            for rect in rects:
+                self._target.blit(self.surface, rect, rect)
+            pygame.display.update([rect.move(self._dest.topleft) for rect in rects])
@@ -0,0 +1,176 @@
+"""Per-frame phase timing with an on-screen HUD and trace export.
+
+The game loop calls begin_frame(), then mark(PHASE) after each phase, then
+end_frame().  mark() charges the time since the previous mark to a phase in a
+preallocated ring buffer covering the last `capacity` frames.  While the
+profiler is disabled every call returns immediately, so the instrumentation
+can stay in the hot path.
+
+The ring buffer can be exported as a Chrome trace (open it in
+chrome://tracing or https://ui.perfetto.dev) or as CSV.
+"""
+import csv
+import json
+import time
+from array import array
+
+import pygame  # Import Pygame library for the HUD
+
+# Phases of a frame, in the order they usually run
+PHASE_EVENTS = 0       # Event handling and input
+PHASE_PHYSICS = 1      # Engine ticks
+PHASE_SOUND = 2        # Triggering sounds and music
+PHASE_LEADERBOARD = 3  # Leaderboard and replay saving
+PHASE_BACKGROUND = 4   # Gradient background
+PHASE_SPRITES = 5      # Paddle, balls, shadow and score
+PHASE_MENU = 6         # Drawing a menu screen
+PHASE_PRESENT = 7      # Pushing the frame to the display
+PHASE_PARTICLES = 8    # Updating and drawing particle bursts
+PHASE_NAMES = ('events', 'physics', 'sound', 'leaderboard', 'background', 'sprites', 'menu', 'present', 'particles')
+
+PROFILE_FRAMES = 600   # Frames kept in the ring buffer (10 seconds at 60 FPS)
+HUD_REFRESH = 0.25     # Seconds between HUD redraws
+HUD_HISTORY = 120      # Frames shown in the frame-time histogram
+HUD_SCALE_MS = 33.3    # Frame time that fills the histogram height
+
+HUD_BACKGROUND = (0, 0, 0, 170)
+HUD_TEXT = (255, 255, 255)
+HUD_BAR = (100, 220, 100)
+HUD_SLOW_BAR = (240, 80, 80)
+
+
+class FrameProfiler:
+    """Ring buffer of per-phase frame timings."""
+
+    def __init__(self, capacity=PROFILE_FRAMES, phase_names=PHASE_NAMES):
+        self.enabled = False
+        self.capacity = capacity
+        self.phase_names = phase_names
+        self._width = len(phase_names) + 2  # Frame start, frame total, then one slot per phase
+        self._rows = array('d', bytes(8 * capacity * self._width))
+        self._next = 0     # Ring buffer slot the next frame goes into
+        self._count = 0    # Frames recorded, up to capacity
+        self._open = False
+        self._row = 0
+        self._last = 0.0
+        self._origin = time.perf_counter()
+        self._hud = None
+        self._hud_time = 0.0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        if self._open:
+            self.end_frame()  # A nested loop (e.g. a menu) took over the frame
+        now = time.perf_counter()
+        row = self._row = self._next * self._width
+        rows = self._rows
+        rows[row] = now - self._origin
+        for i in range(row + 1, row + self._width):
+            rows[i] = 0.0
+        self._last = now
+        self._open = True
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase."""
+        if not self._open:
+            return
+        now = time.perf_counter()
+        self._rows[self._row + 2 + phase] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        if not self._open:
+            return
+        self._rows[self._row + 1] = time.perf_counter() - self._origin - self._rows[self._row]
+        self._open = False
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._open = False
+        self._hud = None
+
+    def frames(self, last=None):
+        """Return recorded rows (start, total, *phases) in seconds, oldest first."""
+        count = self._count if last is None else min(last, self._count)
+        first = (self._next - count) % self.capacity
+        rows = []
+        for i in range(count):
+            row = ((first + i) % self.capacity) * self._width
+            rows.append(self._rows[row:row + self._width])
+        return rows
+
+    # Export
+
+    def export_chrome_trace(self, path):
+        """Write the buffer as Chrome trace events, one slice per frame and per phase."""
+        events = []
+        for row in self.frames():
+            start_us = row[0] * 1e6
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1, 'ts': start_us, 'dur': row[1] * 1e6})
+            offset = start_us
+            for name, duration in zip(self.phase_names, row[2:]):
+                if duration:
+                    events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 2, 'ts': offset, 'dur': duration * 1e6})
+                    offset += duration * 1e6
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def export_csv(self, path):
+        """Write the buffer as CSV, one row per frame, times in milliseconds."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['start_ms', 'total_ms', *(f"{name}_ms" for name in self.phase_names)])
+            for row in self.frames():
+                writer.writerow([f"{value * 1000:.3f}" for value in row])
+
+    def export(self, path):
+        """Export as CSV if path ends in .csv, otherwise as a Chrome trace."""
+        if path.lower().endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_chrome_trace(path)
+
+    # HUD
+
+    def draw_hud(self, surface, font, position=(0, 0)):
+        """Draw FPS, a frame-time histogram and the per-phase breakdown; returns the rect drawn."""
+        now = time.perf_counter()
+        if self._hud is None or now - self._hud_time >= HUD_REFRESH:
+            self._hud = self._render_hud(font)
+            self._hud_time = now
+        x, y = position
+        return surface.blit(self._hud, (surface.get_width() - self._hud.get_width() - x, y))
+
+    def _render_hud(self, font):
+        rows = self.frames(HUD_HISTORY)
+        line_height = font.get_linesize()
+        histogram_height = 40
+        hud = pygame.Surface((HUD_HISTORY * 2 + 20, histogram_height + line_height * (len(self.phase_names) + 1) + 20),
+                             pygame.SRCALPHA)
+        hud.fill(HUD_BACKGROUND)
+        if not rows:
+            return hud
+        average_ms = sum(row[1] for row in rows) / len(rows) * 1000
+        fps = 1000 / average_ms if average_ms else 0.0
+        hud.blit(font.render(f"FPS {fps:.0f}   frame {average_ms:.2f} ms", True, HUD_TEXT), (10, 5))
+
+        # Frame-time histogram, newest frame on the right
+        top = 10 + line_height
+        for i, row in enumerate(rows):
+            frame_ms = row[1] * 1000
+            height = max(1, min(histogram_height, int(frame_ms / HUD_SCALE_MS * histogram_height)))
+            color = HUD_SLOW_BAR if frame_ms > 1000 / 60 else HUD_BAR
+            pygame.draw.rect(hud, color, (10 + i * 2, top + histogram_height - height, 2, height))
+
+        # Average time per phase
+        y = top + histogram_height + 5
+        for index, name in enumerate(self.phase_names):
+            phase_ms = sum(row[2 + index] for row in rows) / len(rows) * 1000
+            value = font.render(f"{phase_ms:.3f} ms", True, HUD_TEXT)
+            hud.blit(font.render(name, True, HUD_TEXT), (10, y))
+            hud.blit(value, (hud.get_width() - value.get_width() - 10, y))
+            y += line_height
+        return hud
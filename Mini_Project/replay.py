@@ -0,0 +1,168 @@
+"""Input recordings that replay a game exactly.
+
+A replay stores the game's RNG seed, skill level, mode, level (for brick
+mode) and tick rate plus one byte of INPUT_* bits per physics tick, zlib-compressed.  Because the engine
+is deterministic for a given seed and input sequence, playing the inputs back
+reproduces the game tick for tick, either in the game window
+(python Ball_Game.py --replay FILE) or headless as fast as possible:
+
+    python replay.py game.bgr            # check the final state still matches
+    python replay.py game.bgr --repeat 50  # repeatable workload for profiling
+
+A stored digest of the final state makes replays usable as regression
+fixtures: playback exits with status 1 if the physics now ends differently.
+"""
+import argparse
+import hashlib
+import struct
+import sys
+import time
+import zlib
+
+import bricks
+import multiball
+from engine import WIDTH, HEIGHT, GameConfig, GameState, step
+
+MAGIC = b'BGRP'
+VERSION = 2  # Version 2 added the level name; version 1 replays played the default level
+HEADER = struct.Struct('<4sBQHIQ')  # magic, version, seed, tick rate, ticks, final-state digest
+FOOTER = struct.Struct('<I')        # final score
+
+
+def new_game(skill, mode, tick_rate, seed, level=bricks.DEFAULT_LEVEL_NAME):
+    """Build the state for a fresh game, plus what the mode adds to it.
+
+    That is the ball array in multi-ball mode and the bricks of the level in
+    brick mode, otherwise None.
+    """
+    state = GameState(GameConfig.for_skill(skill, mode, tick_rate=tick_rate), seed=seed)
+    if mode == 'Multi-Ball':
+        return state, multiball.BallArray()
+    if mode == 'Bricks':
+        return state, bricks.BrickField(bricks.load_level(bricks.level_path(level)), WIDTH, HEIGHT)
+    return state, None
+
+
+def step_game(state, balls, inputs):
+    """Advance any kind of game by one tick (balls is a BallArray, a BrickField or None)."""
+    if isinstance(balls, bricks.BrickField):
+        return bricks.step(state, balls, inputs)
+    if balls is not None:
+        return multiball.step(state, balls, inputs)
+    return step(state, inputs)
+
+
+def state_digest(state, balls=None):
+    """Return a 64-bit fingerprint of the game's final state."""
+    fingerprint = hashlib.sha1(repr((
+        state.ticks, state.score, state.game_over, state.x, state.y,
+        state.dx, state.dy, state.paddle_x, state.background_color,
+    )).encode())
+    if isinstance(balls, bricks.BrickField):
+        fingerprint.update(bytes(balls.alive))
+    elif balls is not None:
+        fingerprint.update(balls.pos.tobytes())
+        fingerprint.update(balls.alive.tobytes())
+    return int.from_bytes(fingerprint.digest()[:8], 'little')
+
+
+def _pack_name(name):
+    data = name.encode()
+    return bytes([len(data)]) + data
+
+
+def _unpack_name(data, offset):
+    length = data[offset]
+    return data[offset + 1:offset + 1 + length].decode(), offset + 1 + length
+
+
+class Replay:
+    """A recorded game: how it started and the inputs of every tick."""
+
+    def __init__(self, seed, skill, mode='Classic', tick_rate=60, inputs=b'', score=0, digest=0,
+                 level=bricks.DEFAULT_LEVEL_NAME):
+        self.seed = seed
+        self.skill = skill
+        self.mode = mode
+        self.level = level  # Level name, as given to bricks.level_path()
+        self.tick_rate = tick_rate
+        self.inputs = bytearray(inputs)  # One byte of INPUT_* bits per tick
+        self.score = score
+        self.digest = digest
+
+    def record(self, inputs):
+        """Append the inputs of one tick."""
+        self.inputs.append(inputs & 0xFF)
+
+    def finish(self, state, balls=None):
+        """Store the final score and state digest once the game is over."""
+        self.score = state.score
+        self.digest = state_digest(state, balls)
+
+    def new_game(self):
+        return new_game(self.skill, self.mode, self.tick_rate, self.seed, self.level)
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.tick_rate, len(self.inputs), self.digest)
+        names = _pack_name(self.skill) + _pack_name(self.mode) + _pack_name(self.level)
+        return header + names + FOOTER.pack(self.score) + zlib.compress(bytes(self.inputs), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, tick_rate, ticks, digest = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("not a bouncing ball replay (or an unsupported version)")
+        skill, offset = _unpack_name(data, HEADER.size)
+        mode, offset = _unpack_name(data, offset)
+        level = bricks.DEFAULT_LEVEL_NAME
+        if version >= 2:
+            level, offset = _unpack_name(data, offset)
+        (score,) = FOOTER.unpack_from(data, offset)
+        inputs = zlib.decompress(data[offset + FOOTER.size:])
+        if len(inputs) != ticks:
+            raise ValueError("replay is truncated")
+        return cls(seed, skill, mode, tick_rate, inputs, score, digest, level)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def play_headless(replay):
+    """Run every recorded tick without rendering and return (state, balls)."""
+    state, balls = replay.new_game()
+    for inputs in replay.inputs:
+        step_game(state, balls, inputs)
+    return state, balls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play replays back headless and check their final state.")
+    parser.add_argument('replays', nargs='+', help="replay files recorded with Ball_Game.py --record")
+    parser.add_argument('--repeat', type=int, default=1, help="play each replay this many times")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.replays:
+        replay = Replay.load(path)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            state, balls = play_headless(replay)
+        elapsed = time.perf_counter() - started
+        matches = state_digest(state, balls) == replay.digest and state.score == replay.score
+        failed |= not matches
+        ticks = len(replay.inputs) * args.repeat
+        mode = f"{replay.mode} {replay.level}" if replay.mode == 'Bricks' else replay.mode
+        print(f"{path}: {replay.skill}/{mode} seed={replay.seed} ticks={len(replay.inputs)} "
+              f"score={state.score} (recorded {replay.score}) {'OK' if matches else 'MISMATCH'} "
+              f"[{ticks / elapsed:,.0f} ticks/s]")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Rewind: the last few seconds of a game, tick by tick.
+
+RewindBuffer.record() packs the state after every physics tick into a slot
+of a preallocated ring buffer with struct.pack_into (57 bytes per tick), so
+recording writes into the same memory all game long and the footprint is
+fixed: 5 seconds of a classic game take 47 KB, RNG checkpoints included.
+Multi-ball positions and velocities and the standing bricks of brick mode go
+into preallocated NumPy arrays the same way.
+
+show(tick) copies a buffered tick back into the game for drawing, which is
+instant, so the past can be scrubbed through frame by frame.  The random
+number generator's 2.5 KB state is only copied (into another preallocated
+array) every CHECKPOINT_TICKS ticks; seek(tick) goes back to the checkpoint
+before the tick and replays the recorded inputs from there, which puts the
+game in exactly the state it had, so play carries on from it (and a replay
+being recorded stays valid once its later inputs are dropped).
+"""
+import csv
+import struct
+
+import numpy as np
+
+import bricks
+import multiball
+from replay import step_game
+
+REWIND_SECONDS = 5       # Length of the buffer in seconds of game time
+CHECKPOINT_TICKS = 30    # Ticks between saved RNG states; seek() replays at most this many
+
+# ticks, score, x, y, dx, dy, paddle_x, which of those five are ints, ball launched, game over,
+# background color, target color
+RECORD = struct.Struct('<IIdddddB??3B3B')
+FIELD_NAMES = ('tick', 'score', 'x', 'y', 'dx', 'dy', 'paddle_x', 'int_fields', 'ball_launched', 'game_over',
+               'background_r', 'background_g', 'background_b', 'target_r', 'target_g', 'target_b')
+
+
+class RewindBuffer:
+    """Ring buffer of the game state after each of the last `seconds` of ticks."""
+
+    def __init__(self, seconds=REWIND_SECONDS):
+        self.seconds = seconds
+        self.capacity = 0
+        self.records = bytearray()
+        self.inputs = bytearray()  # INPUT_* bits that led to each tick, for seek()
+        self._rng_words = None     # Preallocated RNG states, one row per checkpoint slot
+        self._rng_ticks = None     # Tick each checkpoint slot holds, -1 if none
+        self._rng_gauss = []       # The rest of each RNG state (normally None)
+        self.oldest = 0            # First and last tick in the buffer
+        self.newest = 0
+        self._balls = None         # Preallocated (capacity, balls, 2) positions and velocities, alive flags
+        self._bricks = None        # Preallocated (capacity, bricks) standing flags
+
+    def reset(self, state, extra=None):
+        """Forget everything and start buffering a new game from its current state.
+
+        Storage is allocated here (only when the tick rate, mode or level size
+        changed), never while recording.
+        """
+        capacity = self.seconds * state.config.tick_rate
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self.records = bytearray(RECORD.size * capacity)
+            self.inputs = bytearray(capacity)
+            self._balls = self._bricks = None
+            checkpoints = capacity // CHECKPOINT_TICKS + 2
+            self._rng_words = np.zeros((checkpoints, len(state.rng.getstate()[1])), dtype=np.uint32)
+            self._rng_ticks = np.full(checkpoints, -1, dtype=np.int64)
+            self._rng_gauss = [None] * checkpoints
+        if isinstance(extra, bricks.BrickField):
+            if self._bricks is None or self._bricks.shape[1] != len(extra.alive):
+                self._bricks = np.zeros((capacity, len(extra.alive)), dtype=np.uint8)
+        elif isinstance(extra, multiball.BallArray):
+            if self._balls is None or self._balls[0].shape[1] != extra.capacity:
+                self._balls = (np.zeros((capacity, extra.capacity, 2)), np.zeros((capacity, extra.capacity, 2)),
+                               np.zeros((capacity, extra.capacity), dtype=bool))
+        self._rng_ticks[:] = -1
+        self.oldest = self.newest = state.ticks
+        self.record(state, extra, 0)
+
+    def record(self, state, extra, inputs):
+        """Save the state after a tick, given the inputs that tick ran with."""
+        tick = state.ticks
+        slot = tick % self.capacity
+        # Positions start out as ints and turn into floats as the game goes on; keeping
+        # the type means a restored game carries on (and fingerprints) exactly the same
+        int_fields = ((type(state.x) is int) | (type(state.y) is int) << 1 | (type(state.dx) is int) << 2
+                      | (type(state.dy) is int) << 3 | (type(state.paddle_x) is int) << 4)
+        RECORD.pack_into(self.records, slot * RECORD.size, tick, state.score, state.x, state.y, state.dx, state.dy,
+                         state.paddle_x, int_fields, state.ball_launched, state.game_over,
+                         *state.background_color, *state.target_color)
+        self.inputs[slot] = inputs
+        if isinstance(extra, bricks.BrickField):
+            self._bricks[slot] = extra.alive  # Copies the bytes in place
+        elif isinstance(extra, multiball.BallArray):
+            positions, velocities, alive = self._balls
+            np.copyto(positions[slot], extra.pos)
+            np.copyto(velocities[slot], extra.vel)
+            np.copyto(alive[slot], extra.alive)
+        self.newest = tick
+        self.oldest = max(self.oldest, tick - self.capacity + 1)
+        if tick % CHECKPOINT_TICKS == 0:
+            _, words, gauss = state.rng.getstate()
+            checkpoint = self._checkpoint_slot(tick)
+            self._rng_words[checkpoint] = words
+            self._rng_ticks[checkpoint] = tick
+            self._rng_gauss[checkpoint] = gauss
+
+    def _checkpoint_slot(self, tick):
+        return tick // CHECKPOINT_TICKS % len(self._rng_ticks)
+
+    @property
+    def earliest_seek(self):
+        """The oldest tick seek() can go back to (it needs an RNG checkpoint at or before it)."""
+        tick = -(-self.oldest // CHECKPOINT_TICKS) * CHECKPOINT_TICKS  # First checkpoint tick in the buffer
+        if tick > self.newest or self._rng_ticks[self._checkpoint_slot(tick)] != tick:
+            return self.newest
+        return tick
+
+    def show(self, state, extra, tick):
+        """Put a buffered tick back into the game, except for the RNG; returns the tick shown."""
+        tick = min(max(tick, self.oldest), self.newest)
+        slot = tick % self.capacity
+        (state.ticks, state.score, x, y, dx, dy, paddle_x, int_fields,
+         state.ball_launched, state.game_over, *colors) = RECORD.unpack_from(self.records, slot * RECORD.size)
+        state.x, state.y, state.dx, state.dy, state.paddle_x = (
+            int(value) if int_fields & (1 << bit) else value for bit, value in enumerate((x, y, dx, dy, paddle_x)))
+        state.background_color = tuple(colors[:3])
+        state.target_color = tuple(colors[3:])
+        state.prev_x, state.prev_y, state.prev_paddle_x = state.x, state.y, state.paddle_x  # Nothing to blend
+        if isinstance(extra, bricks.BrickField):
+            saved = self._bricks[slot]
+            if extra.alive != saved.tobytes():
+                extra.alive[:] = saved.tobytes()
+                extra.remaining = int(np.count_nonzero(saved))
+                extra.destroyed.clear()
+                extra.generation += 1  # Bricks came back: the brick layer must be baked again
+        elif isinstance(extra, multiball.BallArray):
+            positions, velocities, alive = self._balls
+            np.copyto(extra.pos, positions[slot])
+            np.copyto(extra.prev_pos, positions[slot])
+            np.copyto(extra.vel, velocities[slot])
+            np.copyto(extra.alive, alive[slot])
+        return tick
+
+    def seek(self, state, extra, tick):
+        """Return the game exactly to a buffered tick and drop the ticks after it.
+
+        Returns the tick reached, which is clamped to earliest_seek.
+        """
+        tick = min(max(tick, self.earliest_seek), self.newest)
+        checkpoint = tick - tick % CHECKPOINT_TICKS
+        self.show(state, extra, checkpoint)
+        slot = self._checkpoint_slot(checkpoint)
+        state.rng.setstate((state.rng.VERSION, tuple(self._rng_words[slot].tolist()), self._rng_gauss[slot]))
+        while state.ticks < tick:
+            step_game(state, extra, self.inputs[(state.ticks + 1) % self.capacity])
+        if isinstance(extra, bricks.BrickField):
+            extra.take_destroyed()  # Already accounted for by show()
+        for dropped in range(checkpoint + CHECKPOINT_TICKS, self.newest + 1, CHECKPOINT_TICKS):
+            self._rng_ticks[self._checkpoint_slot(dropped)] = -1
+        self.newest = tick
+        return tick
+
+    def export_csv(self, path):
+        """Write the buffered ticks as CSV, oldest first, for looking into physics bugs."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([*FIELD_NAMES, 'inputs'])
+            for tick in range(self.oldest, self.newest + 1):
+                slot = tick % self.capacity
+                writer.writerow([*RECORD.unpack_from(self.records, slot * RECORD.size), self.inputs[slot]])
@@ -0,0 +1,171 @@
+"""Batch simulator for balancing the skill levels.
+
+Plays thousands of seeded games headlessly with a scripted paddle policy,
+spread across a process pool, and reports the score distribution for every
+entry in skill_levels:
+
+    python sim.py --games 5000 --workers 8
+    python sim.py --skill Expert --paddle-width 90 --ball-speed 7
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import (
+    GameConfig, GameState, step, skill_levels,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_LAUNCH, EVENT_PADDLE,
+)
+
+MAX_TICKS = 100_000    # Cap on the length of a single simulated game
+AIM_ERROR = 0.6        # Aim error of the scripted player, as a fraction of the paddle width
+
+
+def predict_landing_x(state):
+    """Predict where the ball will next cross the paddle line, folding in wall bounces.
+
+    A rising ball is followed up to the top wall and back down, so the
+    player can start moving before it turns around.
+    """
+    cfg = state.config
+    if state.dy == 0:
+        return state.x
+    line = cfg.paddle_y - cfg.radius  # Ball center height when it reaches the paddle
+    if state.dy > 0:
+        distance = line - state.y
+    else:
+        distance = (state.y - cfg.radius) + (line - cfg.radius)  # Up to the top wall, then down
+    ticks = distance / abs(state.dy)
+    low, high = cfg.radius, cfg.width - cfg.radius
+    span = high - low
+    offset = (state.x + state.dx * ticks - low) % (2 * span)
+    return low + (offset if offset <= span else 2 * span - offset)
+
+
+class TrackingPolicy:
+    """Scripted player that moves toward the predicted landing spot with some aim error."""
+
+    def __init__(self, rng, aim_error=AIM_ERROR):
+        self.rng = rng
+        self.aim_error = aim_error
+        self.offset = 0.0
+
+    def aim(self, state):
+        """Pick a new aim offset relative to the paddle center."""
+        self.offset = self.rng.uniform(-self.aim_error, self.aim_error) * state.config.paddle_width
+
+    def __call__(self, state):
+        cfg = state.config
+        if not state.ball_launched:
+            self.aim(state)
+            return INPUT_LAUNCH
+        target = predict_landing_x(state) + self.offset - cfg.paddle_width / 2
+        if target < state.paddle_x - cfg.paddle_speed / 2:
+            return INPUT_LEFT
+        if target > state.paddle_x + cfg.paddle_speed / 2:
+            return INPUT_RIGHT
+        return 0
+
+
+def play_game(config, seed, max_ticks=MAX_TICKS, aim_error=AIM_ERROR):
+    """Play one seeded game to completion and return (score, ticks)."""
+    state = GameState(config, seed=seed)
+    policy = TrackingPolicy(random.Random(seed ^ 0x5EED), aim_error)
+    while not state.game_over and state.ticks < max_ticks:
+        if step(state, policy(state)) & EVENT_PADDLE:
+            policy.aim(state)
+    return state.score, state.ticks
+
+
+def _play_chunk(args):
+    """Process-pool worker: play a contiguous range of seeds for one configuration."""
+    config, seeds, max_ticks, aim_error = args
+    scores, ticks = [], 0
+    for seed in seeds:
+        score, game_ticks = play_game(config, seed, max_ticks, aim_error)
+        scores.append(score)
+        ticks += game_ticks
+    return scores, ticks
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(scores):
+    """Summarize a list of scores as a distribution."""
+    ordered = sorted(scores)
+    return {
+        'games': len(ordered),
+        'mean': statistics.fmean(ordered),
+        'stdev': statistics.pstdev(ordered),
+        'min': ordered[0],
+        'p10': percentile(ordered, 0.10),
+        'p50': percentile(ordered, 0.50),
+        'p90': percentile(ordered, 0.90),
+        'max': ordered[-1],
+    }
+
+
+def run_batch(configs, games, seed=0, workers=None, max_ticks=MAX_TICKS, aim_error=AIM_ERROR, chunk_size=250):
+    """Play `games` seeded games per configuration across a process pool.
+
+    configs maps a name (normally a skill level) to a GameConfig.  Returns a
+    mapping of name to score summary plus the total number of ticks simulated.
+    """
+    jobs = []
+    for name, config in configs.items():
+        for start in range(0, games, chunk_size):
+            seeds = range(seed + start, seed + min(games, start + chunk_size))
+            jobs.append((name, (config, seeds, max_ticks, aim_error)))
+
+    scores = {name: [] for name in configs}
+    total_ticks = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_play_chunk, [job for _, job in jobs])
+        for (name, _), (chunk_scores, chunk_ticks) in zip(jobs, results):
+            scores[name].extend(chunk_scores)
+            total_ticks += chunk_ticks
+    return {name: summarize(values) for name, values in scores.items()}, total_ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate seeded games for every skill level.")
+    parser.add_argument('--games', type=int, default=1000, help="games per skill level")
+    parser.add_argument('--seed', type=int, default=0, help="first seed")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS, help="tick limit per game")
+    parser.add_argument('--aim-error', type=float, default=AIM_ERROR, help="scripted player aim error")
+    parser.add_argument('--skill', action='append', choices=list(skill_levels), help="only simulate this skill")
+    parser.add_argument('--paddle-width', type=int, help="override the paddle width")
+    parser.add_argument('--ball-speed', type=int, help="override the ball speed")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.paddle_width is not None:
+        overrides['paddle_width'] = args.paddle_width
+    if args.ball_speed is not None:
+        overrides['ball_speed'] = args.ball_speed
+    configs = {skill: GameConfig.for_skill(skill, **overrides) for skill in (args.skill or skill_levels)}
+
+    started = time.perf_counter()
+    results, total_ticks = run_batch(configs, args.games, args.seed, args.workers, args.max_ticks, args.aim_error)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps({'results': results, 'ticks': total_ticks, 'seconds': elapsed}, indent=2))
+        return
+    print(f"{'Skill':<14}{'games':>7}{'mean':>9}{'stdev':>9}{'min':>6}{'p10':>6}{'p50':>6}{'p90':>6}{'max':>6}")
+    for skill, summary in results.items():
+        print(f"{skill:<14}{summary['games']:>7}{summary['mean']:>9.2f}{summary['stdev']:>9.2f}"
+              f"{summary['min']:>6}{summary['p10']:>6}{summary['p50']:>6}{summary['p90']:>6}{summary['max']:>6}")
+    print(f"{total_ticks} ticks in {elapsed:.2f}s ({total_ticks / elapsed:,.0f} ticks/s)")
+
+
+if __name__ == '__main__':
+    main()
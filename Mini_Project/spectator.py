@@ -0,0 +1,348 @@
+"""Live spectating over TCP: a broadcast server in the game and a viewer.
+
+The game calls SpectatorServer.publish(state) once per frame, which only
+packs the state into a 32-byte record.  An asyncio loop on its own thread
+sends that record to every connected viewer at a fixed rate (SPECTATOR_RATE
+per second), so slow or stalled viewers never hold up the game loop.
+
+Messages are a 3-byte header (kind, payload length) and a payload:
+
+    KEYFRAME  seq, full record               server -> viewer
+    DELTA     seq, base seq, field mask,     server -> viewer
+              the fields that differ from keyframe `base seq`
+    ACK       seq of a received keyframe     viewer -> server
+
+A new keyframe is made every KEYFRAME_INTERVAL updates.  Each delta is taken
+against the newest keyframe that viewer has acknowledged, never against the
+previous delta, so a viewer that misses updates (its socket buffer was full)
+just gets the next one and is in sync again.  A moving ball costs about 25
+bytes per update, and viewers sharing a keyframe share one encoded message.
+
+Watch a game running with --spectate on this machine:
+
+    python spectator.py [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import asyncio
+import struct
+import threading
+
+SPECTATOR_PORT = 8765
+SPECTATOR_RATE = 20         # Updates per second sent to viewers
+KEYFRAME_INTERVAL = 40      # Updates between keyframes (2 seconds at 20 per second)
+MAX_BUFFERED = 16 * 1024    # Bytes queued for a viewer before its updates are skipped
+KEYFRAMES_KEPT = 4          # Recent keyframes a delta may be based on
+
+KEYFRAME, DELTA, ACK = 1, 2, 3
+HEADER = struct.Struct('<BH')             # Message kind, payload length
+KEYFRAME_HEAD = struct.Struct('<I')       # seq
+DELTA_HEAD = struct.Struct('<IIH')        # seq, base seq, mask of changed fields
+
+# One record: the ball, paddle, score and background color of GameState
+FIELDS = [
+    ('x', 'f'), ('y', 'f'), ('dx', 'f'), ('dy', 'f'), ('paddle_x', 'f'),
+    ('score', 'I'), ('background_color', '3B'), ('flags', 'B'),
+    ('paddle_width', 'H'), ('radius', 'H'),
+]
+RECORD = struct.Struct('<' + ''.join(code for _, code in FIELDS))
+FLAG_LAUNCHED = 1
+FLAG_GAME_OVER = 2
+
+# Byte range of every field inside a record, for building and applying deltas
+_spans = []
+_offset = 0
+for _, _code in FIELDS:
+    _size = struct.calcsize('<' + _code)
+    _spans.append((_offset, _offset + _size))
+    _offset += _size
+
+
+def pack_state(state):
+    """Pack the spectated part of a GameState into a record."""
+    flags = (FLAG_LAUNCHED if state.ball_launched else 0) | (FLAG_GAME_OVER if state.game_over else 0)
+    return RECORD.pack(state.x, state.y, state.dx, state.dy, state.paddle_x, state.score,
+                       *state.background_color, flags, state.config.paddle_width, state.config.radius)
+
+
+def unpack_record(record):
+    """Return a record as a dict of field name -> value."""
+    values = RECORD.unpack(record)
+    snapshot = dict(zip(('x', 'y', 'dx', 'dy', 'paddle_x', 'score'), values[:6]))
+    snapshot['background_color'] = values[6:9]
+    snapshot['launched'] = bool(values[9] & FLAG_LAUNCHED)
+    snapshot['game_over'] = bool(values[9] & FLAG_GAME_OVER)
+    snapshot['paddle_width'], snapshot['radius'] = values[10:12]
+    return snapshot
+
+
+def encode_delta(record, base):
+    """Return (mask, changed bytes) of the fields where record differs from base."""
+    mask = 0
+    changed = bytearray()
+    for bit, (start, end) in enumerate(_spans):
+        if record[start:end] != base[start:end]:
+            mask |= 1 << bit
+            changed += record[start:end]
+    return mask, bytes(changed)
+
+
+def apply_delta(base, mask, changed):
+    """Rebuild a record from a keyframe record and a delta."""
+    record = bytearray(base)
+    position = 0
+    for bit, (start, end) in enumerate(_spans):
+        if mask & (1 << bit):
+            record[start:end] = changed[position:position + end - start]
+            position += end - start
+    return bytes(record)
+
+
+def message(kind, payload):
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+async def read_message(reader):
+    """Read one message; returns (kind, payload)."""
+    kind, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return kind, await reader.readexactly(length)
+
+
+class _Viewer:
+    """Server-side bookkeeping for one connected viewer."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.acked = None     # Newest keyframe seq the viewer confirmed
+        self.sent_key = None  # Newest keyframe seq sent to it
+
+
+class SpectatorServer:
+    """Broadcasts the game state to viewers from a background asyncio loop."""
+
+    def __init__(self, host='127.0.0.1', port=SPECTATOR_PORT, rate=SPECTATOR_RATE,
+                 keyframe_interval=KEYFRAME_INTERVAL):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.keyframe_interval = keyframe_interval
+        self.viewers = []
+        self.bytes_sent = 0
+        self.skipped = 0         # Updates not sent because a viewer was behind
+        self._latest = None      # Newest record from publish(), swapped in whole
+        self._seq = 0
+        self._keyframes = {}     # seq -> record
+        self._key_seq = None
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._broadcaster = None
+        self._error = None       # Why the server could not listen
+
+    def start(self):
+        """Open the port and start broadcasting; returns once the server is listening."""
+        self._thread = threading.Thread(target=self._run, name='spectator-server', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._server is None:
+            raise self._error
+        return self
+
+    def publish(self, state):
+        """Hand the current state to the broadcaster (called from the game loop, never blocks)."""
+        self._latest = pack_state(state)
+
+    def stop(self):
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._serve_viewer, self.host, self.port))
+        except OSError as error:
+            self._error = error
+            self._ready.set()
+            return
+        self.port = self._server.sockets[0].getsockname()[1]  # The real port when 0 was asked for
+        self._ready.set()
+        self._broadcaster = self._loop.create_task(self._broadcast())
+        self._loop.run_forever()
+        self._server.close()
+        self._broadcaster.cancel()
+        for viewer in self.viewers:
+            viewer.writer.close()  # Their handlers see the end of the stream and return
+        self._loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(self._loop), return_exceptions=True))
+        self._loop.close()
+
+    async def _serve_viewer(self, reader, writer):
+        viewer = _Viewer(writer)
+        self.viewers.append(viewer)
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                if kind == ACK:
+                    seq, = KEYFRAME_HEAD.unpack(payload)
+                    if seq in self._keyframes and (viewer.acked is None or seq > viewer.acked):
+                        viewer.acked = seq
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass  # Viewer left or sent garbage
+        finally:
+            self.viewers.remove(viewer)
+            writer.close()
+
+    async def _broadcast(self):
+        interval = 1 / self.rate
+        next_time = self._loop.time()
+        sent_record = None
+        while True:
+            next_time += interval
+            await asyncio.sleep(max(0.0, next_time - self._loop.time()))
+            record = self._latest
+            if record is None or not self.viewers:
+                continue
+            if self._key_seq is None or self._seq - self._key_seq >= self.keyframe_interval:
+                self._new_keyframe(record)
+            elif record == sent_record and all(viewer.sent_key is not None for viewer in self.viewers):
+                continue  # Nothing moved; idle games cost no bandwidth
+            self._seq += 1
+            sent_record = record
+            self._send(record)
+
+    def _new_keyframe(self, record):
+        self._key_seq = self._seq + 1
+        self._keyframes[self._key_seq] = record
+        while len(self._keyframes) > KEYFRAMES_KEPT:
+            del self._keyframes[min(self._keyframes)]
+
+    def _send(self, record):
+        deltas = {}  # Base seq -> encoded message, shared by viewers on the same keyframe
+        keyframe = None
+        for viewer in self.viewers:
+            transport = viewer.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > MAX_BUFFERED:
+                self.skipped += 1  # Viewer is behind; it catches up with a later update
+                continue
+            if viewer.acked not in self._keyframes:
+                viewer.acked = None  # Its keyframe was dropped; start over with a new one
+            if viewer.sent_key != self._key_seq:
+                # The newest keyframe carries this update; until the viewer acks it,
+                # its deltas stay based on the keyframe it acked before
+                if keyframe is None:
+                    keyframe = message(KEYFRAME, KEYFRAME_HEAD.pack(self._key_seq) + self._keyframes[self._key_seq])
+                viewer.writer.write(keyframe)
+                viewer.sent_key = self._key_seq
+                self.bytes_sent += len(keyframe)
+                continue
+            if viewer.acked is None:
+                continue  # Keyframe still on its way
+            data = deltas.get(viewer.acked)
+            if data is None:
+                mask, changed = encode_delta(record, self._keyframes[viewer.acked])
+                data = deltas[viewer.acked] = message(DELTA, DELTA_HEAD.pack(self._seq, viewer.acked, mask) + changed)
+            viewer.writer.write(data)
+            self.bytes_sent += len(data)
+
+
+class SnapshotReceiver:
+    """Viewer-side decoding of keyframes and deltas."""
+
+    def __init__(self):
+        self.keyframes = {}  # seq -> record
+        self.seq = None
+        self.snapshot = None
+
+    def feed(self, kind, payload):
+        """Decode one message; returns the ACK to send back, or None."""
+        if kind == KEYFRAME:
+            seq, = KEYFRAME_HEAD.unpack_from(payload)
+            record = payload[KEYFRAME_HEAD.size:]
+            self.keyframes[seq] = record
+            while len(self.keyframes) > KEYFRAMES_KEPT:
+                del self.keyframes[min(self.keyframes)]
+            self._show(seq, record)
+            return message(ACK, KEYFRAME_HEAD.pack(seq))
+        if kind == DELTA:
+            seq, base, mask = DELTA_HEAD.unpack_from(payload)
+            if base in self.keyframes:
+                self._show(seq, apply_delta(self.keyframes[base], mask, payload[DELTA_HEAD.size:]))
+        return None
+
+    def _show(self, seq, record):
+        if self.seq is None or seq >= self.seq:
+            self.seq = seq
+            self.snapshot = unpack_record(record)
+
+
+async def receive(host, port, receiver):
+    """Keep `receiver` up to date with the game at host:port until the connection ends."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            ack = receiver.feed(*await read_message(reader))
+            if ack is not None:
+                writer.write(ack)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def watch(host, port):
+    """Show the spectated game in a window, drawn with the game's own draw functions."""
+    import pygame
+    import Ball_Game as game  # Opens the game-sized window
+    from engine import BASE_TICK_RATE
+
+    pygame.display.set_caption(f'Spectating {host}:{port}')
+    receiver = SnapshotReceiver()
+    connection = asyncio.ensure_future(receive(host, port, receiver))
+    loop = asyncio.get_running_loop()
+    last_seq = None
+    received_at = loop.time()
+    while not connection.done():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                connection.cancel()
+                return
+        snapshot = receiver.snapshot
+        if snapshot is not None:
+            if receiver.seq != last_seq:
+                last_seq, received_at = receiver.seq, loop.time()
+            # Move the ball on with its velocity until the next update arrives
+            ahead = 0.0
+            if snapshot['launched'] and not snapshot['game_over']:
+                ahead = min(loop.time() - received_at, 2 / SPECTATOR_RATE) * BASE_TICK_RATE
+            ball_x = snapshot['x'] + snapshot['dx'] * ahead
+            ball_y = snapshot['y'] + snapshot['dy'] * ahead
+            radius = snapshot['radius']
+            paddle_y = game.HEIGHT - game.PADDLE_HEIGHT - 10
+            game.draw_gradient_background(snapshot['background_color'], game.BLACK)
+            pygame.draw.rect(game.screen, game.WHITE,
+                             (snapshot['paddle_x'], paddle_y, snapshot['paddle_width'], game.PADDLE_HEIGHT))
+            game.draw_colored_shadow(ball_x, ball_y, radius, paddle_y)
+            game.draw_shaded_ball(ball_x, ball_y, radius, game.ball_color)
+            label = f"Score: {snapshot['score']}" + ("  (game over)" if snapshot['game_over'] else "")
+            game.screen.blit(game.text_cache.render(game.font, label, game.WHITE), (10, 10))
+            game.presenter.flip()
+        await asyncio.sleep(1 / 60)
+    print("Game ended the connection")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a game started with --spectate.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=SPECTATOR_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(watch(args.host, args.port))
+    except ConnectionRefusedError:
+        print(f"No game is being spectated on {args.host}:{args.port}")
+
+
+if __name__ == '__main__':
+    main()
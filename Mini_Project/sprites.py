@@ -0,0 +1,69 @@
+import pygame  # Import Pygame library for surfaces and drawing
+
+from cache import LRUCache
+
+SHADOW_MIN_OPACITY, SHADOW_MAX_OPACITY = 50, 150  # Opacity range used by the ball shadow
+SPRITE_CACHE_SIZE = 32  # Maximum number of ball sprites (and shadow tables) kept around
+
+
+def render_shaded_ball(radius, ball_color):
+    """Render the ball with gradient shading for a 3D effect."""
+    surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    for i in range(radius, 0, -1):
+        color_value = int((radius - i) * 255 / radius)
+        gradient_color = (
+            min(255, ball_color[0] + color_value),
+            min(255, ball_color[1] + color_value),
+            min(255, ball_color[2] + color_value),
+            255,
+        )
+        pygame.draw.circle(surface, gradient_color, (radius, radius), i)
+    return surface
+
+
+def render_shadow(radius, opacity):
+    """Render the elliptical ball shadow at the given opacity."""
+    surface = pygame.Surface((radius * 4, radius * 2), pygame.SRCALPHA)
+    shadow_width = radius * 2
+    shadow_height = radius // 2
+    pygame.draw.ellipse(
+        surface,
+        (0, 0, 0, opacity),
+        (radius - shadow_width // 2, radius, shadow_width, shadow_height),
+    )
+    return surface
+
+
+def render_shadow_table(radius):
+    """Render one shadow sprite per opacity level in the clamped range."""
+    return [render_shadow(radius, opacity) for opacity in range(SHADOW_MIN_OPACITY, SHADOW_MAX_OPACITY + 1)]
+
+
+class SpriteCache:
+    """Pre-rendered ball and shadow sprites so drawing a frame is only blits."""
+
+    def __init__(self, maxsize=SPRITE_CACHE_SIZE):
+        self._balls = LRUCache(maxsize)
+        self._shadows = LRUCache(maxsize)
+
+    def ball(self, radius, ball_color):
+        """Return the shaded ball sprite for (radius, ball_color)."""
+        key = (radius, tuple(ball_color))
+        return self._balls.get(key, lambda: render_shaded_ball(radius, ball_color))
+
+    def shadow(self, radius, opacity):
+        """Return the shadow sprite for radius at an opacity in the 50-150 range."""
+        opacity = max(SHADOW_MIN_OPACITY, min(SHADOW_MAX_OPACITY, int(opacity)))
+        table = self._shadows.get(radius, lambda: render_shadow_table(radius))
+        return table[opacity - SHADOW_MIN_OPACITY]
+
+    def warm(self, radii, colors):
+        """Render every (radius, color) ball and each radius' shadow table up front."""
+        for radius in radii:
+            self.shadow(radius, SHADOW_MIN_OPACITY)
+            for ball_color in colors:
+                self.ball(radius, ball_color)
+
+    def clear(self):
+        self._balls.clear()
+        self._shadows.clear()
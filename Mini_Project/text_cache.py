@@ -0,0 +1,18 @@
+from cache import LRUCache
+
+TEXT_CACHE_SIZE = 256  # Rendered strings kept around
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color)."""
+
+    def __init__(self, maxsize=TEXT_CACHE_SIZE):
+        self._cache = LRUCache(maxsize)
+
+    def render(self, font, text, color):
+        """Return the antialiased surface for text, rendering it only on a miss."""
+        key = (font, text, tuple(color))
+        return self._cache.get(key, lambda: font.render(text, True, color))
+
+    def clear(self):
+        self._cache.clear()